@@ -0,0 +1,91 @@
+import os
+import threading
+from typing import Dict, List, Iterable
+
+import numpy as np
+import pandas as pd
+
+from file_lock import FileLock
+
+
+class AddressDictionary:
+    """
+    Persistent, append-only interning of wallet addresses, mints and
+    signatures as int32 codes.
+
+    Codes are assigned in order of first appearance and stored one value per
+    line, so a code never changes once assigned. Appends are serialized with
+    a lock file and every process first catches up with lines written by
+    others, so all server processes agree on the codes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._offset = 0
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(path + ".lock")
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        """Read values appended to the file since the last sync"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        # Only consume complete lines; a partial last line is read next time
+        end = data.rfind(b"\n") + 1
+        for value in data[:end].decode().splitlines():
+            self._codes[value] = len(self._values)
+            self._values.append(value)
+        self._offset += end
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def encode(self, values: Iterable[str]) -> np.ndarray:
+        """int32 codes of values, interning the ones not seen before"""
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        unique_codes = np.empty(len(uniques), dtype=np.int32)
+
+        with self._lock:
+            missing = [value for value in uniques if value not in self._codes]
+            if missing:
+                with self._file_lock:
+                    self._sync()
+                    new_values = [value for value in dict.fromkeys(missing) if value not in self._codes]
+                    if new_values:
+                        with open(self.path, 'a') as f:
+                            f.write("".join(f"{value}\n" for value in new_values))
+                        self._sync()
+
+            for i, value in enumerate(uniques):
+                unique_codes[i] = self._codes[value]
+
+        return unique_codes[codes]
+
+    def decode_categorical(self, codes: Iterable[int]) -> pd.Categorical:
+        """
+        Values of the given codes as a categorical. Only distinct codes are
+        decoded, and categories are in value order, so sorting the result
+        orders rows by the original strings.
+        """
+        uniques, positions = np.unique(np.asarray(codes, dtype=np.int64), return_inverse=True)
+        with self._lock:
+            values = np.array([self._values[code] for code in uniques], dtype=object)
+        order = np.argsort(values, kind='stable')
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+        return pd.Categorical.from_codes(ranks[positions.reshape(-1)], categories=values[order])
+
+    def decode(self, codes: Iterable[int]) -> np.ndarray:
+        """Values of the given codes as an object array"""
+        positions, unique_codes = pd.factorize(np.asarray(codes, dtype=np.int64))
+        with self._lock:
+            values = np.array([self._values[code] for code in unique_codes], dtype=object)
+        return values[positions]
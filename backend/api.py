@@ -1,23 +1,63 @@
 import os
-import json
 import time
 import glob
 import requests
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
-from fastapi import FastAPI, HTTPException
+from typing import Annotated, Dict, Any, List, Callable, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+
+from address_dictionary import AddressDictionary
+from copy_trade_store import CopyTradeStore, SWAP_DETAIL_COLUMNS, flatten_swap
+from file_lock import FileLock
+from follower_aggregates import FollowerAggregates
+from follower_index import FollowerIndex
+from http_client import get_http_client
+from jobs import Job, JobManager
+from snapshots import EXPORT_FORMATS, export_snapshot, latest_snapshot, write_snapshot
+import scoring
+from scoring import ScoringParams
+from serialization import dump_file, dumps_str, load_file, loads, orjson
+from pagination import decode_position_cursor, encode_cursor, page_follower_scores
+from score_cache import ScoreSnapshotCache
+from swap_cache import SwapCache
+from swap_file_cache import SwapFileCache
+from swap_records import RawSwap, encode_swaps
+from swap_windows import plan_swap_windows, split_swaps_by_window
+from transaction_store import open_transaction_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("copy_trader_api")
 
+# Responses are encoded with orjson when it is installed
+DefaultJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+# Responses smaller than this are sent uncompressed
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESSION_MIN_BYTES", "1000"))
+
 # Initialize FastAPI app
-app = FastAPI(title="Copy Trader API")
+app = FastAPI(title="Copy Trader API", default_response_class=DefaultJSONResponse)
+
+# Compress large responses: brotli (falling back to gzip) if brotli-asgi is
+# installed, otherwise gzip. Event streams are excluded so events are not
+# held back in the compressor.
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_BYTES,
+                       excluded_handlers=[r"/jobs/[^/]+/events"])
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_BYTES)
 
 # Configure CORS
 app.add_middleware(
@@ -37,6 +77,92 @@ TRANSACTION_TYPES = ["SWAP", "TRANSFER"]
 TOTAL_TRANSACTIONS_NEEDED = 700
 TRANSACTIONS_PER_PAGE = 100
 
+# Length of the follower window fetched after each leader buy (seconds)
+SWAP_WINDOW_SECONDS = 3
+# Swap windows that ended this long before they were fetched are immutable
+SWAP_WINDOW_SETTLE_SECONDS = 300
+
+# Global cross-wallet swap cache shared by all leaders
+SWAP_CACHE_DIR = os.path.join(os.path.dirname(__file__), "data", "_swap_cache")
+SWAP_CACHE_MAX_BYTES = int(os.environ.get("SWAP_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+swap_cache = SwapCache(SWAP_CACHE_DIR, SWAP_CACHE_MAX_BYTES, SWAP_WINDOW_SETTLE_SECONDS)
+
+# In-memory cache of parsed per-lead swap window files, shared by all requests
+SWAP_FILE_CACHE_MAX_BYTES = int(os.environ.get("SWAP_FILE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+swap_file_cache = SwapFileCache(SWAP_FILE_CACHE_MAX_BYTES)
+
+# Interning dictionary of addresses, mints and lead signatures shared by all
+# wallets; copy trade tables and follower aggregates carry int32 codes and
+# are decoded only at the snapshot and response boundaries
+address_dictionary = AddressDictionary(os.path.join(os.path.dirname(__file__), "data", "_dictionary", "addresses.txt"))
+
+# Number of leader buys whose swaps are fetched in parallel; request pacing
+# per provider is handled by the shared HTTP client's rate limiter
+SWAP_FETCH_CONCURRENCY = int(os.environ.get("SWAP_FETCH_CONCURRENCY", "8"))
+
+# Run steps 1-3 as one streaming pass instead of separate batch steps
+STREAMING_INGESTION = os.environ.get("STREAMING_INGESTION", "1").lower() in ("1", "true", "yes")
+# Keep writing raw Helius transactions to disk (in the background when streaming)
+PERSIST_RAW_TRANSACTIONS = os.environ.get("PERSIST_RAW_TRANSACTIONS", "1").lower() in ("1", "true", "yes")
+
+# Number of wallet analyses that can run concurrently in the background
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+# Provisional follower scores are streamed at most this often (seconds)
+PROVISIONAL_SCORES_INTERVAL = 2.0
+# Number of top followers included in each provisional scores event
+PROVISIONAL_TOP_FOLLOWERS = 20
+
+# Latest follower-score snapshots are served from memory for this long
+# before the wallet directory is checked for a newer one (seconds)
+SCORES_CACHE_TTL_SECONDS = float(os.environ.get("SCORES_CACHE_TTL_SECONDS", "60"))
+SCORES_CACHE_MAX_ENTRIES = int(os.environ.get("SCORES_CACHE_MAX_ENTRIES", "128"))
+# Snapshots older than this trigger a background re-analysis when requested
+SCORES_MAX_AGE_SECONDS = float(os.environ.get("SCORES_MAX_AGE_SECONDS", "3600"))
+# Largest number of parameter settings evaluated by one backtest request
+MAX_BACKTEST_SETTINGS = 500
+MAX_BACKTEST_MIN_HITS = 10000
+
+# Page size of GET /wallets/{address}/scores and the largest page any endpoint returns
+SCORES_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+score_cache = ScoreSnapshotCache(os.path.join(os.path.dirname(__file__), "data"),
+                                 SCORES_CACHE_TTL_SECONDS, SCORES_CACHE_MAX_ENTRIES)
+
+# Global follower -> (leader, hits, score) index across all analyzed wallets
+FOLLOWER_INDEX_PATH = os.path.join(os.path.dirname(__file__), "data", "_follower_index", "followers.sqlite")
+# Leaders with more followers are skipped when counting shared leaders of follower pairs
+# for clusters (min_shared >= 2), which costs the square of a leader's follower count
+CLUSTER_MAX_LEADER_FOLLOWERS = int(os.environ.get("CLUSTER_MAX_LEADER_FOLLOWERS", "1000"))
+# Most follower pairs one cluster query may count; larger queries are rejected
+CLUSTER_MAX_PAIRS = int(os.environ.get("CLUSTER_MAX_PAIRS", str(20_000_000)))
+
+def open_follower_index() -> FollowerIndex:
+    """Open the follower index, indexing existing score snapshots when it is first created"""
+    created = not os.path.exists(FOLLOWER_INDEX_PATH)
+    index = FollowerIndex(FOLLOWER_INDEX_PATH, CLUSTER_MAX_LEADER_FOLLOWERS, CLUSTER_MAX_PAIRS)
+    if created:
+        data_dir = os.path.dirname(os.path.dirname(FOLLOWER_INDEX_PATH))
+        for wallet_address in sorted(os.listdir(data_dir)):
+            # Shared directories (swap cache, dictionary, index) start with "_"
+            if wallet_address.startswith("_"):
+                continue
+            path = latest_snapshot(os.path.join(data_dir, wallet_address), "follower_scores")
+            if path is not None:
+                index.update_leader(wallet_address, pd.read_parquet(path, columns=['addr', 'hits', 'score', 'tier']))
+    return index
+
+follower_index = open_follower_index()
+
+# Formats copy-trade and follower-score snapshots are written in on every run;
+# Parquet is always written, other formats are otherwise exported on request
+OUTPUT_FORMATS = [fmt.strip() for fmt in os.environ.get("OUTPUT_FORMATS", "parquet").split(",") if fmt.strip()]
+_unsupported_formats = sorted(set(OUTPUT_FORMATS) - set(EXPORT_FORMATS))
+if _unsupported_formats:
+    raise ValueError(f"Unsupported OUTPUT_FORMATS {', '.join(_unsupported_formats)}; "
+                     f"expected any of {', '.join(EXPORT_FORMATS)}")
+# Number of timestamped snapshots of each table kept per wallet (at least the latest)
+SNAPSHOT_RETENTION = max(1, int(os.environ.get("SNAPSHOT_RETENTION", "5")))
+
 # Follower scoring constants
 WINDOW = 10  # Maximum delay for speed normalization
 TIER_BOUNDARIES = {
@@ -44,6 +170,7 @@ TIER_BOUNDARIES = {
     'Silver': 0.5,
     'Bronze': 0.3
 }
+SCORING_PARAMS = ScoringParams(window=WINDOW, tier_boundaries=TIER_BOUNDARIES)
 
 # List of known non-memecoin tokens (SOL and common stablecoins)
 NON_MEMECOINS = [
@@ -53,6 +180,8 @@ NON_MEMECOINS = [
     'mSoLzYCxHdYgdzU16g5QSh3i5K3z3KZK7ytfqcJm7So',  # mSOL
 ]
 
+job_manager = JobManager(JOB_WORKERS)
+
 # Models
 class WalletRequest(BaseModel):
     wallet_address: str
@@ -81,6 +210,8 @@ class FollowerScore(BaseModel):
 class CopyTransactionRequest(BaseModel):
     target_wallet: str
     follower_wallet: str
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
 
 class TokenInfo(BaseModel):
     address: str
@@ -103,6 +234,20 @@ class CopyTransaction(BaseModel):
 
 class CopyTransactionsResponse(BaseModel):
     transactions: List[CopyTransaction]
+    next_cursor: Optional[str] = None
+
+# Models for the scoring backtest endpoint
+class ScoreWeights(BaseModel):
+    freq: float
+    speed: float
+    breadth: float
+
+class BacktestRequest(BaseModel):
+    # Windows must exceed fast_delay (see ScoringParams)
+    windows: List[Annotated[int, Field(gt=SCORING_PARAMS.fast_delay, le=scoring.MAX_WINDOW)]] = [WINDOW]
+    min_hits: List[Annotated[int, Field(ge=1, le=MAX_BACKTEST_MIN_HITS)]] = [3]
+    weights: List[ScoreWeights] = [ScoreWeights(freq=0.5, speed=0.3, breadth=0.2)]
+    tier_boundaries: List[Dict[str, float]] = [TIER_BOUNDARIES]
 
 # Step 1: Fetch Transactions
 def ensure_wallet_data_dirs(wallet_address: str) -> Dict[str, str]:
@@ -128,21 +273,18 @@ def ensure_wallet_data_dirs(wallet_address: str) -> Dict[str, str]:
         "copy_trades_dir": copy_trades_dir
     }
 
-def save_transaction(transaction: Dict[Any, Any], transactions_dir: str):
-    """Save a single transaction as a JSON file"""
-    signature = transaction.get("signature", "")
-    if not signature:
-        return
-    
-    # Use first 8 characters of signature as filename
-    filename = f"{signature[:8]}.json"
-    filepath = os.path.join(transactions_dir, filename)
-    
-    with open(filepath, 'w') as f:
-        json.dump(transaction, f, indent=2)
+def save_transactions(transactions: List[Dict[Any, Any]], transactions_dir: str) -> int:
+    """Append a page of transactions to the wallet's transaction store"""
+    return open_transaction_store(transactions_dir).append(transactions)
 
-def fetch_transactions(wallet_address: str, before_signature: str = None) -> List[Dict[Any, Any]]:
-    """Fetch transactions from Helius API with pagination"""
+def fetch_transactions(wallet_address: str, before_signature: str = None,
+                       until_signature: str = None) -> List[Dict[Any, Any]]:
+    """
+    Fetch transactions from Helius API with pagination.
+    If until_signature is given, only transactions newer than it are returned.
+    Errors (including throttling that outlasts retries) are raised, not
+    turned into an empty page.
+    """
     url = f"{HELIUS_BASE_URL}/{wallet_address}/transactions"
     
     params = {
@@ -154,51 +296,148 @@ def fetch_transactions(wallet_address: str, before_signature: str = None) -> Lis
     if before_signature:
         params["before"] = before_signature
     
+    if until_signature:
+        params["until"] = until_signature
+    
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        return get_http_client().get_json(url, params=params)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching transactions: {e}")
-        return []
+        raise
 
-def fetch_and_save_transactions(wallet_address: str) -> Dict[str, Any]:
-    """Fetch transactions for a wallet and save them to disk"""
-    # Set up directories
-    dirs = ensure_wallet_data_dirs(wallet_address)
-    transactions_dir = dirs["transactions_dir"]
+def load_watermark(wallet_dir: str) -> Optional[Dict[str, Any]]:
+    """Load the newest already-ingested transaction (signature/slot) for a wallet"""
+    watermark_path = os.path.join(wallet_dir, "watermark.json")
+    if not os.path.exists(watermark_path):
+        return None
     
-    all_transactions = []
-    last_signature = None
+    return load_file(watermark_path)
+
+def save_watermark(wallet_dir: str, transaction: Dict[Any, Any], backfill: Optional[Dict[str, Any]] = None):
+    """
+    Persist the newest ingested transaction as the wallet's watermark, plus
+    the backfill still needed to close a gap below newer transactions
+    """
+    watermark = {
+        "signature": transaction.get("signature"),
+        "slot": transaction.get("slot"),
+        "timestamp": transaction.get("timestamp"),
+        "updated_at": datetime.now().isoformat()
+    }
+    if backfill:
+        watermark["backfill"] = backfill
     
-    while len(all_transactions) < TOTAL_TRANSACTIONS_NEEDED:
+    watermark_path = os.path.join(wallet_dir, "watermark.json")
+    dump_file(watermark, watermark_path)
+
+def get_fetch_range(dirs: Dict[str, str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (before, until) signatures of the next transaction fetch: until is the
+    watermark, or None if the wallet has no stored history and needs a full
+    fetch; before is where a pending backfill resumes, otherwise None
+    """
+    watermark = load_watermark(dirs["wallet_dir"])
+    if not watermark:
+        return None, None
+    
+    # Only trust the watermark if the history it refers to is still on disk
+    if not len(open_transaction_store(dirs["transactions_dir"])) and not os.listdir(dirs["filtered_dir"]):
+        return None, None
+    
+    backfill = watermark.get("backfill") or {}
+    return backfill.get("before"), watermark.get("signature")
+
+def advance_watermark(dirs: Dict[str, str], newest: Optional[Dict[str, Any]], oldest: Optional[Dict[str, Any]],
+                      fetched: int, until_signature: Optional[str]) -> bool:
+    """
+    Move the watermark after a fetch of fetched transactions (newest and
+    oldest of them) and return whether a backfill is still pending.
+    
+    An incremental fetch that stops at TOTAL_TRANSACTIONS_NEEDED before
+    reaching the watermark leaves a gap. The watermark then stays put and
+    the gap is backfilled from the oldest fetched transaction by later
+    runs; only once the watermark is reached does it move to the newest
+    transaction seen while the gap was open.
+    """
+    wallet_dir = dirs["wallet_dir"]
+    watermark = load_watermark(wallet_dir) if until_signature else None
+    pending = (watermark or {}).get("backfill")
+    target = pending["newest"] if pending else newest
+    
+    if until_signature is None or fetched < TOTAL_TRANSACTIONS_NEEDED:
+        if target is not None:
+            save_watermark(wallet_dir, target)
+        return False
+    
+    save_watermark(wallet_dir, watermark, {
+        "before": oldest.get("signature"),
+        "newest": {key: target.get(key) for key in ("signature", "slot", "timestamp")},
+    })
+    print(f"Fetched {fetched} transactions without reaching the watermark; backfilling the rest on the next run")
+    return True
+
+def iter_transaction_pages(wallet_address: str, until_signature: Optional[str] = None,
+                           before_signature: Optional[str] = None):
+    """
+    Yield pages of Helius transactions, newest first (starting below
+    before_signature if given), until TOTAL_TRANSACTIONS_NEEDED transactions
+    were fetched or, if until_signature is given, the watermark was reached
+    """
+    fetched = 0
+    last_signature = before_signature
+    
+    while fetched < TOTAL_TRANSACTIONS_NEEDED:
         # Fetch transactions
-        transactions = fetch_transactions(wallet_address, last_signature)
+        transactions = fetch_transactions(wallet_address, last_signature, until_signature)
         
         if not transactions:
             print(f"No more transactions for wallet {wallet_address}")
             break
-            
-        # Save each transaction as a separate file
-        for tx in transactions:
-            save_transaction(tx, transactions_dir)
-            
-        all_transactions.extend(transactions)
+        
+        # Trim to exact number needed
+        transactions = transactions[:TOTAL_TRANSACTIONS_NEEDED - fetched]
+        fetched += len(transactions)
         
         # Update last signature for pagination
-        if transactions:
-            last_signature = transactions[-1].get("signature")
+        last_signature = transactions[-1].get("signature")
+        
+        yield transactions
+
+def fetch_and_save_transactions(wallet_address: str) -> Dict[str, Any]:
+    """
+    Fetch transactions for a wallet and save them to disk.
+    
+    The first run downloads the latest TOTAL_TRANSACTIONS_NEEDED transactions.
+    Later runs only fetch pages newer than the stored watermark and merge them
+    into the existing history.
+    """
+    # Set up directories
+    dirs = ensure_wallet_data_dirs(wallet_address)
+    transactions_dir = dirs["transactions_dir"]
+    
+    before_signature, until_signature = get_fetch_range(dirs)
+    
+    all_transactions = []
+    
+    for transactions in iter_transaction_pages(wallet_address, until_signature, before_signature):
+        # Append the page to the transaction store
+        save_transactions(transactions, transactions_dir)
         
-        # Add a small delay to avoid rate limiting
-        time.sleep(0.5)
+        all_transactions.extend(transactions)
         
         print(f"Fetched and saved {len(all_transactions)} transactions so far for {wallet_address}...")
     
-    # Trim to exact number needed
-    all_transactions = all_transactions[:TOTAL_TRANSACTIONS_NEEDED]
+    # Advance the watermark to the newest transaction seen, unless a gap is left
+    backfill_pending = advance_watermark(
+        dirs, all_transactions[0] if all_transactions else None,
+        all_transactions[-1] if all_transactions else None, len(all_transactions), until_signature
+    )
     
     return {
         "transactions_fetched": len(all_transactions),
+        "incremental": until_signature is not None,
+        "backfill_pending": backfill_pending,
+        "transactions_stored": len(open_transaction_store(transactions_dir)),
         "first_signature": all_transactions[0].get("signature") if all_transactions else None,
         "last_signature": all_transactions[-1].get("signature") if all_transactions else None,
         "transactions_dir": transactions_dir
@@ -239,40 +478,40 @@ def save_filtered_transaction(tx_data: Dict[str, Any], filtered_dir: str):
     filename = f"{signature[:8]}.json"
     filepath = os.path.join(filtered_dir, filename)
     
-    with open(filepath, 'w') as f:
-        json.dump(tx_data, f, indent=2)
+    dump_file(tx_data, filepath)
 
 def filter_transactions(wallet_address: str) -> Dict[str, Any]:
     """
     Process all transactions for a wallet and filter for memecoin purchases
     """
     dirs = ensure_wallet_data_dirs(wallet_address)
-    transactions_dir = dirs["transactions_dir"]
     filtered_dir = dirs["filtered_dir"]
     
-    total_txs = 0
+    # Scan only the columns needed to detect buys
+    table = open_transaction_store(dirs["transactions_dir"]).scan(
+        ["signature", "feePayer", "slot", "timestamp", "tokenTransfers"]
+    )
+    
+    total_txs = table.num_rows
     buy_txs = 0
     
-    # Process each transaction file
-    for filename in os.listdir(transactions_dir):
-        if not filename.endswith('.json'):
-            continue
-            
-        total_txs += 1
-        filepath = os.path.join(transactions_dir, filename)
-        
+    # Only transactions paid by the wallet can be its buys
+    fee_payers = table.column("feePayer").to_pylist()
+    candidates = [i for i, fee_payer in enumerate(fee_payers) if fee_payer == wallet_address]
+    
+    rows = table.take(candidates).to_pylist() if candidates else []
+    for row in rows:
         try:
-            with open(filepath, 'r') as f:
-                tx = json.load(f)
-                
+            row['tokenTransfers'] = loads(row['tokenTransfers'])
+            
             # Analyze transaction
-            filtered_data = analyze_transaction(tx, wallet_address)
+            filtered_data = analyze_transaction(row, wallet_address)
             if filtered_data:
                 save_filtered_transaction(filtered_data, filtered_dir)
                 buy_txs += 1
                 
         except Exception as e:
-            print(f"Error processing {filename}: {e}")
+            print(f"Error processing {row.get('signature')}: {e}")
     
     return {
         "total_transactions": total_txs,
@@ -284,7 +523,8 @@ def filter_transactions(wallet_address: str) -> Dict[str, Any]:
 # Step 3: Fetch Swaps
 def fetch_token_swaps(token_address: str, from_date: int, to_date: int, cursor: Optional[str] = None) -> Dict[Any, Any]:
     """
-    Fetch swap transactions for a specific token address using timestamps
+    Fetch swap transactions for a specific token address using timestamps.
+    Errors are raised so a throttled window is never mistaken for an empty one.
     """
     url = f"{MORALIS_BASE_URL}/{token_address}/swaps"
     
@@ -305,34 +545,35 @@ def fetch_token_swaps(token_address: str, from_date: int, to_date: int, cursor:
         url += "?" + "&".join(params)
     
     headers = {
-        "Accept": "application/json",
         "X-API-Key": MORALIS_API_KEY
     }
     
     try:
         print(f"Requesting URL: {url}")
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        return data
+        return get_http_client().get_json(url, headers=headers)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching swaps: {e}")
-        return {}
+        raise
 
-def fetch_all_swaps(token_address: str, from_date: int, to_date: int) -> List[Dict[Any, Any]]:
+def fetch_swap_window(token_address: str, from_date: int, to_date: int) -> Tuple[List[RawSwap], int]:
     """
-    Fetch all swap transactions using pagination
+    Fetch all swap transactions in a window, following every cursor page.
+    Returns the swaps and the number of pages fetched; each page is turned
+    into (record, JSON) pairs as it arrives, so no more than one page of
+    Moralis dicts is held at a time.
     """
     all_results = []
     cursor = None
+    pages = 0
     
     while True:
         result = fetch_token_swaps(token_address, from_date, to_date, cursor)
+        pages += 1
         
         if not result or 'result' not in result:
             break
             
-        all_results.extend(result['result'])
+        all_results.extend(encode_swaps(result['result']))
         
         # Check if there's a cursor for the next page
         cursor = result.get('cursor')
@@ -341,23 +582,235 @@ def fetch_all_swaps(token_address: str, from_date: int, to_date: int) -> List[Di
             
         print(f"Fetching next page with cursor: {cursor}")
     
-    return all_results
+    return all_results, pages
 
-def save_swaps_to_file(data: List[Dict[Any, Any]], token_address: str, original_tx_signature: str, token_swaps_dir: str):
+def fetch_all_swaps(token_address: str, from_date: int, to_date: int) -> List[Dict[Any, Any]]:
     """
-    Save the swaps data to a JSON file in the token_swaps directory
+    Fetch all swap transactions using pagination
+    """
+    return [loads(data) for _, data in fetch_swap_window(token_address, from_date, to_date)[0]]
+
+def save_swaps_to_file(swaps: List[RawSwap], token_address: str, original_tx_signature: str, token_swaps_dir: str):
+    """
+    Save the swaps (as returned by Moralis) to a JSON file in the
+    token_swaps directory and keep their records in the swap file cache
     """
     # Create filename using token address and original transaction signature
     filename = f"swaps_{token_address[:8]}_{original_tx_signature[:8]}.json"
     filepath = os.path.join(token_swaps_dir, filename)
     
-    with open(filepath, 'w') as f:
-        json.dump({"result": data}, f, indent=2)
+    with open(filepath, 'wb') as f:
+        f.write(b'{"result":[' + b','.join(data for _, data in swaps) + b']}')
+    swap_file_cache.put(filepath, [record for record, _ in swaps])
     
     print(f"Swaps data saved to: {filepath}")
     return filepath
 
-def fetch_swaps_for_filtered_transactions(wallet_address: str) -> Dict[str, Any]:
+def load_swaps_manifest(token_swaps_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the manifest of fully fetched swap windows, keyed by lead signature
+    """
+    manifest_path = os.path.join(token_swaps_dir, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return {}
+    
+    return load_file(manifest_path)
+
+def save_swaps_manifest(manifest: Dict[str, Dict[str, Any]], token_swaps_dir: str):
+    """Persist the manifest of fully fetched swap windows"""
+    manifest_path = os.path.join(token_swaps_dir, "manifest.json")
+    tmp_path = manifest_path + ".tmp"
+    
+    dump_file(manifest, tmp_path)
+    os.replace(tmp_path, manifest_path)
+
+def is_window_reusable(entry: Optional[Dict[str, Any]], token_swaps_dir: str) -> bool:
+    """
+    A stored window can be reused if every cursor page was fetched after the
+    window had settled and its swaps file (if any) is still on disk
+    """
+    if not entry or not entry.get("complete"):
+        return False
+    
+    if entry["fetched_at"] < entry["to_date"] + SWAP_WINDOW_SETTLE_SECONDS:
+        return False
+    
+    filepath = entry.get("filepath")
+    return filepath is None or os.path.exists(os.path.join(token_swaps_dir, filepath))
+
+def fetch_swaps_for_plan(plan: Dict[str, Any], token_swaps_dir: str) -> List[Dict[str, Any]]:
+    """
+    Fetch the swaps of a planned (possibly merged) window through the global
+    swap cache (one paginated query per uncached sub-range), then split and
+    save them per lead buy. Each window's JSON is released as soon as it is
+    written; only its records stay in the swap file cache.
+    Returns one manifest entry per lead buy in the plan.
+    """
+    token_address = plan['mint']
+    from_date = plan['from_date']
+    to_date = plan['to_date']
+    buys = plan['buys']
+    
+    print(f"Fetching swaps for token {token_address} from {from_date} to {to_date} ({len(buys)} lead buys)")
+    
+    # Fetch all swaps for this token in the (merged) time window
+    all_results, pages = swap_cache.get_window(token_address, from_date, to_date, fetch_swap_window)
+    fetched_at = int(time.time())
+    
+    swaps_by_buy = split_swaps_by_window(all_results, buys, SWAP_WINDOW_SECONDS,
+                                         swap_time=lambda swap: swap[0].block_timestamp)
+    del all_results
+    
+    entries = []
+    for buy in buys:
+        signature = buy['signature']
+        swaps = swaps_by_buy.pop(signature)
+        swaps_found = len(swaps)
+        
+        # Save results to file if any were found
+        filepath = None
+        if swaps:
+            filepath = save_swaps_to_file(swaps, token_address, signature, token_swaps_dir)
+        del swaps
+        
+        entries.append({
+            "token": token_address,
+            "timestamp": buy['timestamp'],
+            "signature": signature,
+            "slot": buy['slot'],
+            "from_date": buy['timestamp'],
+            "to_date": buy['timestamp'] + SWAP_WINDOW_SECONDS,
+            "query_window": [from_date, to_date],
+            "pages": pages,
+            "from_cache": pages == 0,
+            "complete": True,
+            "fetched_at": fetched_at,
+            "swaps_found": swaps_found,
+            "filepath": os.path.basename(filepath) if filepath else None
+        })
+    
+    return entries
+
+class SwapWindowFetcher:
+    """
+    Concurrent, manifest-aware swap fetching for one wallet's lead buys.
+    
+    Buys can be submitted in batches while earlier batches are still being
+    fetched. Windows recorded as complete in the token_swaps manifest are
+    reused, overlapping windows of the same mint within a batch are merged
+    into one query, and queries run on up to max_workers threads with request
+    pacing left to the shared per-host rate limiter. If given,
+    on_window(entry, processed, submitted) is called for every finished
+    window, from the worker thread that finished it.
+    """
+    
+    def __init__(self, token_swaps_dir: str, max_workers: int = SWAP_FETCH_CONCURRENCY,
+                 on_window: Optional[Callable[[Dict[str, Any], int, int], None]] = None):
+        self.token_swaps_dir = token_swaps_dir
+        self.on_window = on_window
+        self.manifest = load_swaps_manifest(token_swaps_dir)
+        self.windows: List[Dict[str, Any]] = []
+        self.windows_reused = 0
+        self.queries = 0
+        self.submitted = 0
+        self.failed: List[str] = []
+        self._lock = threading.Lock()
+        self._futures = []
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    
+    def submit(self, buys: List[Dict[str, Any]]):
+        """Queue swap fetching for a batch of lead buys without waiting for it"""
+        pending = []
+        reused = []
+        with self._lock:
+            self.submitted += len(buys)
+            for tx_data in buys:
+                entry = self.manifest.get(tx_data['signature'])
+                if is_window_reusable(entry, self.token_swaps_dir):
+                    self.windows.append(entry)
+                    self.windows_reused += 1
+                    reused.append(entry)
+                else:
+                    pending.append(tx_data)
+        self._notify(reused)
+        
+        # Merge overlapping windows of the same mint into single queries
+        plans = plan_swap_windows(pending, SWAP_WINDOW_SECONDS)
+        with self._lock:
+            self.queries += len(plans)
+        
+        for plan in plans:
+            future = self._executor.submit(fetch_swaps_for_plan, plan, self.token_swaps_dir)
+            future.add_done_callback(lambda f, plan=plan: self._on_done(plan, f))
+            self._futures.append(future)
+    
+    def _on_done(self, plan: Dict[str, Any], future):
+        try:
+            entries = future.result()
+        except Exception as e:
+            print(f"Error fetching swaps for {plan['mint']} ({len(plan['buys'])} lead buys): {e}")
+            with self._lock:
+                self.failed.extend(buy['signature'] for buy in plan['buys'])
+            return
+        
+        with self._lock:
+            for entry in entries:
+                self.manifest[entry["signature"]] = entry
+                self.windows.append(entry)
+            print(f"Processed {len(self.windows)}/{self.submitted} lead buys")
+        self._notify(entries)
+    
+    def _notify(self, entries: List[Dict[str, Any]]):
+        if not self.on_window:
+            return
+        for entry in entries:
+            with self._lock:
+                processed, submitted = len(self.windows), self.submitted
+            try:
+                self.on_window(entry, processed, submitted)
+            except Exception as e:
+                print(f"Error in swap window callback: {e}")
+    
+    def finish(self) -> Dict[str, Any]:
+        """
+        Wait for all submitted buys, persist the manifest and return the summary.
+        Raises if any buy could not be fetched, since a missing window would
+        silently drop followers.
+        """
+        try:
+            self._executor.shutdown(wait=True)
+        finally:
+            # Record completed windows even if some buys failed
+            save_swaps_manifest(self.manifest, self.token_swaps_dir)
+        
+        if self.failed:
+            raise RuntimeError(
+                f"Failed to fetch swaps for {len(self.failed)} of {self.submitted} leader buys"
+            )
+        
+        swaps_data = [
+            {
+                "token": entry["token"],
+                "timestamp": entry["timestamp"],
+                "signature": entry["signature"],
+                "swaps_found": entry["swaps_found"],
+                "filepath": os.path.join(self.token_swaps_dir, entry["filepath"])
+            }
+            for entry in self.windows if entry["swaps_found"]
+        ]
+        
+        return {
+            "filtered_transactions_processed": len(self.windows),
+            "windows_reused": self.windows_reused,
+            "windows_fetched": len(self.windows) - self.windows_reused,
+            "moralis_queries": self.queries,
+            "tokens_with_swaps": len(swaps_data),
+            "total_swaps_found": sum(entry["swaps_found"] for entry in swaps_data),
+            "swaps_data": swaps_data
+        }
+
+def fetch_swaps_for_filtered_transactions(wallet_address: str, max_workers: int = SWAP_FETCH_CONCURRENCY,
+                                          on_window: Optional[Callable[[Dict[str, Any], int, int], None]] = None) -> Dict[str, Any]:
     """
     For each filtered transaction, fetch swaps that occurred right after it
     """
@@ -367,151 +820,245 @@ def fetch_swaps_for_filtered_transactions(wallet_address: str) -> Dict[str, Any]
     
     # Get all filtered transaction files
     filtered_files = glob.glob(os.path.join(filtered_dir, "*.json"))
+    print(f"Found {len(filtered_files)} filtered transaction files to process")
     
-    total_files = len(filtered_files)
-    print(f"Found {total_files} filtered transaction files to process")
+    fetcher = SwapWindowFetcher(token_swaps_dir, max_workers, on_window)
+    fetcher.submit([load_filtered_transaction(filtered_file) for filtered_file in filtered_files])
+    print(f"Reusing {fetcher.windows_reused} stored swap windows, fetching the rest with {fetcher.queries} queries")
     
-    swaps_data = []
-    processed_count = 0
-    tokens_with_swaps = 0
-    total_swaps_found = 0
+    return fetcher.finish()
+
+# Steps 1-3 fused: streaming ingestion
+def run_streaming_ingestion(wallet_address: str,
+                            on_window: Optional[Callable[[Dict[str, Any], int, int], None]] = None
+                            ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """
+    Fetch, filter and fetch swaps in one streaming pass.
+    
+    Each Helius page goes straight through analyze_transaction and the buys
+    it contains are queued for swap fetching while the next page is being
+    downloaded. Raw transactions are written by a background sink when
+    PERSIST_RAW_TRANSACTIONS is enabled, so the transaction store is never
+    written or re-read on the critical path.
+    on_window is passed on to the SwapWindowFetcher.
+    Returns the (fetch, filter, swaps) results of the equivalent batch steps.
+    """
+    dirs = ensure_wallet_data_dirs(wallet_address)
+    before_signature, until_signature = get_fetch_range(dirs)
     
-    for i, filtered_file in enumerate(filtered_files, 1):
-        try:
-            # Read the filtered transaction file
-            with open(filtered_file, 'r') as f:
-                tx_data = json.load(f)
-            
-            token_address = tx_data['mint']
-            timestamp = tx_data['timestamp']
-            signature = tx_data['signature']
-            
-            print(f"Processing file {i}/{total_files}")
-            print(f"Token Address: {token_address}")
-            print(f"Timestamp: {timestamp}")
-            
-            # Fetch swaps from timestamp to timestamp + 3 seconds
-            from_date = timestamp
-            to_date = timestamp + 3
-            
-            # Fetch all swaps for this token in the time window
-            all_results = fetch_all_swaps(token_address, from_date, to_date)
+    fetcher = SwapWindowFetcher(dirs["token_swaps_dir"], on_window=on_window)
+    sink = ThreadPoolExecutor(max_workers=1)
+    sink_futures = []
+    
+    newest = None
+    last = None
+    total_txs = 0
+    buys = []
+    
+    try:
+        for transactions in iter_transaction_pages(wallet_address, until_signature, before_signature):
+            if newest is None:
+                newest = transactions[0]
+            last = transactions[-1]
+            total_txs += len(transactions)
             
-            # Save results to file if any were found
-            if all_results:
-                filepath = save_swaps_to_file(all_results, token_address, signature, token_swaps_dir)
-                tokens_with_swaps += 1
-                total_swaps_found += len(all_results)
-                
-                swaps_data.append({
-                    "token": token_address,
-                    "timestamp": timestamp,
-                    "signature": signature,
-                    "swaps_found": len(all_results),
-                    "filepath": filepath
-                })
+            if PERSIST_RAW_TRANSACTIONS:
+                sink_futures.append(sink.submit(save_transactions, transactions, dirs["transactions_dir"]))
             
-            processed_count += 1
+            page_buys = [
+                filtered_data for filtered_data in
+                (analyze_transaction(tx, wallet_address) for tx in transactions)
+                if filtered_data
+            ]
+            for filtered_data in page_buys:
+                save_filtered_transaction(filtered_data, dirs["filtered_dir"])
             
-            # Add a small delay to avoid rate limiting
-            time.sleep(0.5)
+            fetcher.submit(page_buys)
+            buys.extend(page_buys)
             
-        except Exception as e:
-            print(f"Error processing file {filtered_file}: {e}")
-            continue
+            print(f"Streamed {total_txs} transactions ({len(buys)} buys) so far for {wallet_address}...")
+        
+        # Buys from earlier runs complete the history; their windows are
+        # normally reused from the manifest
+        streamed = {buy['signature'] for buy in buys}
+        previous_buys = [
+            tx_data for tx_data in
+            (load_filtered_transaction(path) for path in glob.glob(os.path.join(dirs["filtered_dir"], "*.json")))
+            if tx_data['signature'] not in streamed
+        ]
+        fetcher.submit(previous_buys)
+    finally:
+        sink.shutdown(wait=True)
+        swaps_result = fetcher.finish()
+    
+    # Surface persistence errors before moving the watermark
+    for future in sink_futures:
+        future.result()
+    
+    backfill_pending = advance_watermark(dirs, newest, last, total_txs, until_signature)
+    
+    fetch_result = {
+        "transactions_fetched": total_txs,
+        "incremental": until_signature is not None,
+        "backfill_pending": backfill_pending,
+        "transactions_stored": len(open_transaction_store(dirs["transactions_dir"])),
+        "first_signature": newest.get("signature") if newest else None,
+        "last_signature": last.get("signature") if last else None,
+        "transactions_dir": dirs["transactions_dir"]
+    }
     
-    return {
-        "filtered_transactions_processed": processed_count,
-        "tokens_with_swaps": tokens_with_swaps,
-        "total_swaps_found": total_swaps_found,
-        "swaps_data": swaps_data
+    filter_result = {
+        "total_transactions": total_txs,
+        "buy_transactions": len(buys),
+        "buy_percentage": round((len(buys)/total_txs*100), 2) if total_txs > 0 else 0,
+        "filtered_dir": dirs["filtered_dir"]
     }
+    
+    return fetch_result, filter_result, swaps_result
 
 # Step 4: Analyze Copy Trades
 def load_filtered_transaction(file_path: str) -> Dict[str, Any]:
     """Load a single filtered transaction file"""
-    with open(file_path, 'r') as f:
-        return json.load(f)
+    return load_file(file_path)
 
 def load_swap_data(file_path: str) -> Dict[str, Any]:
-    """Load a single swap data file"""
-    with open(file_path, 'r') as f:
-        return json.load(f)
+    """Load a single swap data file as SwapRecords (through the shared cache; do not modify the result)"""
+    return {"result": swap_file_cache.get(file_path)}
 
-def create_copy_trades_table(wallet_address: str) -> pd.DataFrame:
+COPY_TRADES_COLUMNS = [
+    'lead_index', 'token', 'follower_addr', 'delay_slots',
+    'lead_slot', 'follower_slot', 'timestamp'
+]
+# Copy trade columns holding address_dictionary codes
+CODED_COLUMNS = ['lead_index', 'token', 'follower_addr']
+
+def decode_copy_trades(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copy of a table with its CODED_COLUMNS as categoricals of the original
+    strings, so each distinct code is decoded once and Parquet snapshots get
+    dictionary columns
+    """
+    decoded = df.copy()
+    for column in CODED_COLUMNS:
+        if column in decoded and not decoded.empty:
+            decoded[column] = address_dictionary.decode_categorical(decoded[column].to_numpy())
+    return decoded
+
+def load_lead_buys(filtered_dir: str) -> pd.DataFrame:
     """
-    Create a table of copy trades by analyzing filtered transactions and swap data
+    Load all filtered lead buys as a table indexed by lead signature, with
+    signatures and mints as address_dictionary codes
     """
-    # Initialize lists to store the data
-    copy_trades = []
+    lead_buys = [
+        load_filtered_transaction(os.path.join(filtered_dir, filtered_tx_file))
+        for filtered_tx_file in os.listdir(filtered_dir)
+        if filtered_tx_file.endswith('.json')
+    ]
+    
+    return pd.DataFrame({
+        'lead_index': address_dictionary.encode([tx['signature'] for tx in lead_buys]),
+        'token': address_dictionary.encode([tx['mint'] for tx in lead_buys]),
+        'lead_slot': pd.array([tx['slot'] for tx in lead_buys], dtype='int64'),
+        'timestamp': pd.array([tx['timestamp'] for tx in lead_buys], dtype='int64'),
+    })
+
+def load_swap_records(lead_buys: pd.DataFrame, token_swaps_dir: str, details: bool = False) -> pd.DataFrame:
+    """
+    Load the swap window of every lead buy as one columnar table of
+    (lead_index, follower_addr, follower_slot) records, plus the flattened
+    SWAP_DETAIL_COLUMNS of each swap if details is set. Lead signatures and
+    follower addresses are address_dictionary codes.
+    """
+    lead_column = []
+    follower_column = []
+    slot_column = []
+    detail_rows = []
+    missing = 0
     
-    # Get paths to directories
-    dirs = ensure_wallet_data_dirs(wallet_address)
-    filtered_dir = dirs["filtered_dir"]
-    token_swaps_dir = dirs["token_swaps_dir"]
+    lead_signatures = address_dictionary.decode(lead_buys['lead_index'].to_numpy())
+    token_mints = address_dictionary.decode(lead_buys['token'].to_numpy())
     
-    # Process each filtered transaction
-    for filtered_tx_file in os.listdir(filtered_dir):
-        if not filtered_tx_file.endswith('.json'):
-            continue
-            
-        # Load filtered transaction data
-        filtered_tx_path = os.path.join(filtered_dir, filtered_tx_file)
-        filtered_tx = load_filtered_transaction(filtered_tx_path)
-        
-        lead_signature = filtered_tx['signature']
-        token_mint = filtered_tx['mint']
-        lead_slot = filtered_tx['slot']
-        
-        # Find corresponding swap data
+    for lead_code, lead_signature, token_mint in zip(lead_buys['lead_index'], lead_signatures, token_mints):
         # The swap file name format is: swaps_{token_mint[:8]}_{lead_signature[:8]}.json
-        swap_file = f"swaps_{token_mint[:8]}_{lead_signature[:8]}.json"
-        swap_path = os.path.join(token_swaps_dir, swap_file)
+        swap_path = os.path.join(token_swaps_dir, f"swaps_{token_mint[:8]}_{lead_signature[:8]}.json")
         
         if not os.path.exists(swap_path):
-            print(f"No swap data found for {lead_signature}")
+            missing += 1
             continue
-            
-        # Load and process swap data
-        swap_data = load_swap_data(swap_path)
         
-        if not swap_data.get('result'):
-            continue
-            
-        # Process each swap in the result
-        for swap in swap_data['result']:
-            follower_addr = swap['walletAddress']
-            follower_slot = swap['blockNumber']
-            
-            # Calculate delay in slots
-            delay_slots = follower_slot - lead_slot
-            
-            # Add to copy trades list
-            copy_trades.append({
-                'lead_index': lead_signature,
-                'token': token_mint,
-                'follower_addr': follower_addr,
-                'delay_slots': delay_slots,
-                'lead_slot': lead_slot,
-                'follower_slot': follower_slot,
-                'timestamp': filtered_tx['timestamp']
-            })
-    
-    # Create DataFrame
-    df = pd.DataFrame(copy_trades)
-    
-    # If the DataFrame is empty, return an empty DataFrame with the expected columns
-    if df.empty:
-        return pd.DataFrame(columns=[
-            'lead_index', 'token', 'follower_addr', 'delay_slots', 
-            'lead_slot', 'follower_slot', 'timestamp'
-        ])
-    
-    # Sort by lead_index and delay_slots
-    df = df.sort_values(['lead_index', 'delay_slots'])
+        swaps = load_swap_data(swap_path).get('result') or []
+        lead_column.extend([lead_code] * len(swaps))
+        follower_column.extend(swap.wallet_address for swap in swaps)
+        slot_column.extend(swap.block_number for swap in swaps)
+        if details:
+            detail_rows.extend(flatten_swap(swap) for swap in swaps)
+    
+    if missing:
+        print(f"No swap data found for {missing} lead transactions")
+    
+    records = pd.DataFrame({
+        'lead_index': np.array(lead_column, dtype=np.int32),
+        'follower_addr': address_dictionary.encode(follower_column),
+        'follower_slot': pd.array(slot_column, dtype='int64'),
+    })
+    if details:
+        records[SWAP_DETAIL_COLUMNS] = pd.DataFrame(detail_rows, columns=SWAP_DETAIL_COLUMNS)
+    
+    return records
+
+def join_copy_trades(lead_buys: pd.DataFrame, swaps: pd.DataFrame) -> pd.DataFrame:
+    """Join lead buys with swap records on the lead signature"""
+    # If there is nothing to join, return an empty DataFrame with the expected columns
+    if swaps.empty:
+        return pd.DataFrame(columns=COPY_TRADES_COLUMNS)
+    
+    df = swaps.merge(lead_buys, on='lead_index', how='inner')
+    
+    # Calculate delay in slots
+    df['delay_slots'] = df['follower_slot'] - df['lead_slot']
+    
+    # Sort by lead signature and delay_slots; codes follow first appearance,
+    # so order by the signature-ordered categorical codes rather than the code
+    signature_rank = address_dictionary.decode_categorical(df['lead_index'].to_numpy()).codes
+    df = df[COPY_TRADES_COLUMNS].assign(_lead_rank=signature_rank)
+    df = df.sort_values(['_lead_rank', 'delay_slots']).drop(columns='_lead_rank')
     
     return df
 
+def create_copy_trades_table(wallet_address: str) -> pd.DataFrame:
+    """
+    Create a table of copy trades by joining all lead buys with all swap
+    records on the lead signature (coded; see decode_copy_trades)
+    """
+    # Get paths to directories
+    dirs = ensure_wallet_data_dirs(wallet_address)
+    
+    lead_buys = load_lead_buys(dirs["filtered_dir"])
+    swaps = load_swap_records(lead_buys, dirs["token_swaps_dir"])
+    
+    return join_copy_trades(lead_buys, swaps)
+
+def get_copy_trade_store(wallet_address: str) -> CopyTradeStore:
+    """The indexed copy-trade store of a wallet (which may not be built yet)"""
+    wallet_dir = os.path.join(os.path.dirname(__file__), "data", wallet_address)
+    return CopyTradeStore(os.path.join(wallet_dir, "copy_trades.sqlite"))
+
+def build_copy_trade_store(wallet_address: str) -> Tuple[pd.DataFrame, CopyTradeStore]:
+    """
+    Create the (coded) copy trades table of a wallet and rebuild its
+    indexed store from the same swap records
+    """
+    dirs = ensure_wallet_data_dirs(wallet_address)
+    
+    lead_buys = load_lead_buys(dirs["filtered_dir"])
+    swaps = load_swap_records(lead_buys, dirs["token_swaps_dir"], details=True)
+    df = join_copy_trades(lead_buys, swaps)
+    
+    store = get_copy_trade_store(wallet_address)
+    store.rebuild(decode_copy_trades(df), decode_copy_trades(swaps))
+    
+    return df, store
+
 def save_copy_trades_table(df: pd.DataFrame, wallet_address: str) -> Dict[str, Any]:
     """
     Save the copy trades table in multiple formats for easy access
@@ -523,17 +1070,8 @@ def save_copy_trades_table(df: pd.DataFrame, wallet_address: str) -> Dict[str, A
     dirs = ensure_wallet_data_dirs(wallet_address)
     copy_trades_dir = dirs["copy_trades_dir"]
     
-    # Save as CSV
-    csv_path = os.path.join(copy_trades_dir, f"copy_trades_{timestamp}.csv")
-    df.to_csv(csv_path, index=False)
-    
-    # Save as Parquet (more efficient for large datasets)
-    parquet_path = os.path.join(copy_trades_dir, f"copy_trades_{timestamp}.parquet")
-    df.to_parquet(parquet_path, index=False)
-    
-    # Save as JSON (for easy programmatic access)
-    json_path = os.path.join(copy_trades_dir, f"copy_trades_{timestamp}.json")
-    df.to_json(json_path, orient='records', indent=2)
+    # Save as Parquet, plus any other configured formats
+    paths = write_snapshot(decode_copy_trades(df), copy_trades_dir, "copy_trades", timestamp, OUTPUT_FORMATS, SNAPSHOT_RETENTION)
     
     # Generate summary statistics
     stats = {
@@ -541,9 +1079,7 @@ def save_copy_trades_table(df: pd.DataFrame, wallet_address: str) -> Dict[str, A
         "unique_lead_transactions": df['lead_index'].nunique() if not df.empty else 0,
         "unique_followers": df['follower_addr'].nunique() if not df.empty else 0,
         "unique_tokens": df['token'].nunique() if not df.empty else 0,
-        "csv_path": csv_path,
-        "parquet_path": parquet_path,
-        "json_path": json_path
+        "paths": paths
     }
     
     # Add delay statistics if the DataFrame is not empty
@@ -569,8 +1105,8 @@ def analyze_copy_trades(wallet_address: str) -> Dict[str, Any]:
     """
     Create and save the copy trades table for a wallet
     """
-    # Create the copy trades table
-    df = create_copy_trades_table(wallet_address)
+    # Create the copy trades table and its indexed store
+    df, _ = build_copy_trade_store(wallet_address)
     
     # Save the table and get statistics
     stats = save_copy_trades_table(df, wallet_address)
@@ -578,104 +1114,39 @@ def analyze_copy_trades(wallet_address: str) -> Dict[str, Any]:
     return stats, df
 
 # Step 5: Calculate Follower Scores
-def clean_copy_trades(df: pd.DataFrame) -> pd.DataFrame:
+def clean_copy_trades(df: pd.DataFrame, params: ScoringParams = None) -> pd.DataFrame:
     """
     Clean the copy trades data by applying filtering rules
     
     Rules:
     1. Drop rows where delay_slots < 0 (frontrunning/MEV)
-    2. Keep rows where 0 <= delay_slots <= WINDOW
+    2. Keep rows where 0 <= delay_slots <= window
     """
-    if df.empty:
-        return df
-    
-    # Apply filtering rules
-    cleaned_df = df[(df['delay_slots'] >= 0) & (df['delay_slots'] <= WINDOW)]
-    
-    return cleaned_df
+    return scoring.clean_copy_trades(df, params or SCORING_PARAMS)
 
-def calculate_follower_metrics(df: pd.DataFrame) -> pd.DataFrame:
+def calculate_follower_metrics(df: pd.DataFrame, params: ScoringParams = None) -> pd.DataFrame:
     """
-    Calculate metrics for each follower
+    Calculate metrics for each follower with at least min_hits copy trades
     """
-    if df.empty:
-        return pd.DataFrame(columns=[
-            'addr', 'hits', 'breadth', 'avg_delay', 'med_delay'
-        ])
-    
-    # Group by follower address and calculate metrics
-    metrics = df.groupby('follower_addr').agg({
-        'lead_index': 'count',  # hits
-        'token': 'nunique',     # breadth
-        'delay_slots': ['mean', 'median']  # avg_delay and med_delay
-    }).reset_index()
-    
-    # Rename columns for clarity
-    metrics.columns = ['addr', 'hits', 'breadth', 'avg_delay', 'med_delay']
-    
-    # Filter out followers with less than 3 hits
-    metrics = metrics[metrics['hits'] >= 3]
-    
-    return metrics
+    return scoring.follower_metrics(df, params or SCORING_PARAMS)
 
-def normalize_metrics(metrics: pd.DataFrame, total_lead_buys: int) -> pd.DataFrame:
+def normalize_metrics(metrics: pd.DataFrame, total_lead_buys: int, params: ScoringParams = None) -> pd.DataFrame:
     """
     Normalize the metrics according to the specified formulas
     """
-    if metrics.empty:
-        return metrics
-    
-    # Calculate normalizations
-    metrics['freq_norm'] = metrics['hits'] / total_lead_buys
-    
-    # breadth_norm = breadth / hits
-    metrics['breadth_norm'] = metrics['breadth'] / metrics['hits']
-    
-    # speed_norm: 1.0 if avg_delay ≤ 4, else linear fall-off to 0.0 at WINDOW
-    metrics['speed_norm'] = metrics['avg_delay'].apply(
-        lambda x: 1.0 if x <= 4 else max(0, 1 - (x - 4) / (WINDOW - 4))
-    )
-    
-    return metrics
+    return scoring.normalize_metrics(metrics, total_lead_buys, params or SCORING_PARAMS)
 
-def calculate_scores(metrics: pd.DataFrame) -> pd.DataFrame:
+def calculate_scores(metrics: pd.DataFrame, params: ScoringParams = None) -> pd.DataFrame:
     """
     Calculate the final copy score and assign tiers
     """
-    if metrics.empty:
-        return metrics
-    
-    # Calculate copy score
-    metrics['score'] = (
-        0.5 * metrics['freq_norm'] +
-        0.3 * metrics['speed_norm'] +
-        0.2 * metrics['breadth_norm']
-    )
-    
-    # Assign tiers based on score
-    def assign_tier(score: float) -> str:
-        if score >= TIER_BOUNDARIES['Gold']:
-            return 'Gold'
-        elif score >= TIER_BOUNDARIES['Silver']:
-            return 'Silver'
-        elif score >= TIER_BOUNDARIES['Bronze']:
-            return 'Bronze'
-        return 'Unranked'
-    
-    metrics['tier'] = metrics['score'].apply(assign_tier)
-    
-    return metrics
+    return scoring.calculate_scores(metrics, params or SCORING_PARAMS)
 
 def save_follower_scores(metrics: pd.DataFrame, wallet_address: str) -> Dict[str, Any]:
     """
-    Save the follower scores and return the data
+    Save the follower scores and return the data. An empty table is saved
+    too, so a wallet without followers still has a snapshot with a known age.
     """
-    if metrics.empty:
-        return {
-            "total_followers": 0,
-            "follower_scores": []
-        }
-    
     # Create timestamp for file names
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
@@ -687,13 +1158,10 @@ def save_follower_scores(metrics: pd.DataFrame, wallet_address: str) -> Dict[str
     numeric_cols = ['avg_delay', 'med_delay', 'score', 'freq_norm', 'speed_norm', 'breadth_norm']
     metrics[numeric_cols] = metrics[numeric_cols].round(3)
     
-    # Save as JSON
-    json_path = os.path.join(wallet_dir, f"follower_scores_{timestamp}.json")
-    metrics.to_json(json_path, orient='records', indent=2)
-    
-    # Save as Parquet
-    parquet_path = os.path.join(wallet_dir, f"follower_scores_{timestamp}.parquet")
-    metrics.to_parquet(parquet_path, index=False)
+    # Save as Parquet, plus any other configured formats
+    paths = write_snapshot(metrics, wallet_dir, "follower_scores", timestamp, OUTPUT_FORMATS, SNAPSHOT_RETENTION)
+    score_cache.invalidate(wallet_address)
+    follower_index.update_leader(wallet_address, metrics)
     
     # Create the response data
     follower_scores = metrics.to_dict('records')
@@ -705,35 +1173,61 @@ def save_follower_scores(metrics: pd.DataFrame, wallet_address: str) -> Dict[str
         "total_followers": len(metrics),
         "tier_distribution": tier_distribution,
         "follower_scores": follower_scores,
-        "json_path": json_path
+        "paths": paths
     }
 
+def update_follower_aggregates(wallet_address: str, copy_trades_df: pd.DataFrame) -> FollowerAggregates:
+    """
+    Fold the copy trades of lead buys not seen before into the wallet's
+    persisted follower aggregates and return aggregates covering the whole
+    table. Only settled swap windows are persisted; rows of windows that may
+    still change are added to a copy for this run only.
+    """
+    dirs = ensure_wallet_data_dirs(wallet_address)
+    aggregates_path = os.path.join(dirs["wallet_dir"], "follower_aggregates.parquet")
+    aggregates = FollowerAggregates.load(aggregates_path, SCORING_PARAMS.window, address_dictionary)
+    
+    lead_codes = copy_trades_df['lead_index'].unique()
+    new_leads = lead_codes[~np.isin(lead_codes, list(aggregates.leads))]
+    if len(new_leads) == 0:
+        return aggregates
+    new_rows = copy_trades_df[copy_trades_df['lead_index'].isin(new_leads)]
+    
+    # The manifest is keyed by signature, so only the new leads are decoded
+    manifest = load_swaps_manifest(dirs["token_swaps_dir"])
+    settled_leads = [
+        code for code, signature in zip(new_leads, address_dictionary.decode(new_leads))
+        if is_window_reusable(manifest.get(signature), dirs["token_swaps_dir"])
+    ]
+    settled = new_rows['lead_index'].isin(settled_leads)
+    
+    if settled.any():
+        aggregates.update(new_rows[settled])
+        aggregates.save(aggregates_path, address_dictionary)
+    
+    if not settled.all():
+        aggregates = aggregates.copy()
+        aggregates.update(new_rows[~settled])
+    
+    return aggregates
+
 def calculate_follower_scores(wallet_address: str, copy_trades_df: pd.DataFrame) -> Dict[str, Any]:
     """
-    Calculate and save follower scores based on copy trades data
+    Calculate and save follower scores based on copy trades data.
+    Follower metrics come from the incrementally updated aggregates, so only
+    lead buys added since the last run are processed.
     """
-    # Clean the copy trades data
-    cleaned_df = clean_copy_trades(copy_trades_df)
-    
-    # If data is empty after cleaning, return empty results
-    if cleaned_df.empty:
-        return {
-            "total_followers": 0,
-            "follower_scores": []
-        }
+    aggregates = update_follower_aggregates(wallet_address, copy_trades_df)
+    metrics, total_lead_buys = aggregates.metrics(SCORING_PARAMS.min_hits)
     
-    # Calculate total number of unique lead transactions
-    total_lead_buys = cleaned_df['lead_index'].nunique()
+    # If no copy trades fall within the window or no followers meet the
+    # criteria, save empty results
+    if total_lead_buys == 0 or metrics.empty:
+        return save_follower_scores(scoring.empty_scores(), wallet_address)
     
-    # Calculate follower metrics
-    metrics = calculate_follower_metrics(cleaned_df)
-    
-    # If no followers meet criteria, return empty results
-    if metrics.empty:
-        return {
-            "total_followers": 0,
-            "follower_scores": []
-        }
+    # Followers are decoded once here, for the snapshot and the response
+    metrics['addr'] = address_dictionary.decode(metrics['addr'].to_numpy())
+    metrics = metrics.sort_values('addr').reset_index(drop=True)
     
     # Normalize metrics
     metrics = normalize_metrics(metrics, total_lead_buys)
@@ -746,71 +1240,430 @@ def calculate_follower_scores(wallet_address: str, copy_trades_df: pd.DataFrame)
     
     return results
 
-# Main API endpoint
-@app.post("/process-wallet", response_model=ProgressResponse)
-async def process_wallet(request: WalletRequest):
+# Pipeline
+class ProvisionalScorer:
     """
-    Process a wallet address through multiple steps
+    Builds copy trades from swap windows as they finish and periodically
+    publishes provisional follower scores and swap-fetch progress on a job.
+    
+    Windows are handed to a single scoring thread, so swap-fetch workers
+    never load or score windows themselves and events are published one at
+    a time, in the order the windows were handed over.
     """
-    wallet_address = request.wallet_address
     
-    try:
-        # Step 1: Fetch transactions
-        fetch_result = fetch_and_save_transactions(wallet_address)
-        
-        # Step 2: Filter transactions
-        filter_result = filter_transactions(wallet_address)
+    def __init__(self, job: Job, token_swaps_dir: str):
+        self.job = job
+        self.token_swaps_dir = token_swaps_dir
+        self.rows: List[Dict[str, Any]] = []
+        self.last_published = 0.0
+        self._worker = ThreadPoolExecutor(max_workers=1)
+    
+    def on_window(self, entry: Dict[str, Any], processed: int, submitted: int):
+        """SwapWindowFetcher callback: queue the window for the scoring thread"""
+        self._worker.submit(self._record, entry, processed, submitted)
+    
+    def close(self):
+        """Wait for the queued windows and stop the scoring thread"""
+        self._worker.shutdown(wait=True)
+    
+    def _record(self, entry: Dict[str, Any], processed: int, submitted: int):
+        """Record the window's copy trades and publish scores if the interval elapsed"""
+        try:
+            self._process(entry, processed, submitted)
+        except Exception as e:
+            print(f"Error recording provisional scores: {e}")
+    
+    def _process(self, entry: Dict[str, Any], processed: int, submitted: int):
+        self.job.publish("swaps", {
+            "processed": processed,
+            "submitted": submitted,
+            "signature": entry["signature"],
+            "token": entry["token"],
+            "swaps_found": entry["swaps_found"],
+        })
         
-        # Step 3: Fetch swaps for filtered transactions
-        swaps_result = fetch_swaps_for_filtered_transactions(wallet_address)
+        # Windows from older manifests lack the lead slot; they only count in the final scores
+        if entry["swaps_found"] and entry.get("slot") is not None:
+            swap_data = load_swap_data(os.path.join(self.token_swaps_dir, entry["filepath"]))
+            rows = [
+                {
+                    'lead_index': entry["signature"],
+                    'token': entry["token"],
+                    'follower_addr': swap.wallet_address,
+                    'delay_slots': swap.block_number - entry["slot"],
+                }
+                for swap in swap_data.get('result', [])
+            ]
+            self.rows.extend(rows)
         
-        # Step 4: Analyze copy trades
-        analysis_result, copy_trades_df = analyze_copy_trades(wallet_address)
+        if time.monotonic() - self.last_published >= PROVISIONAL_SCORES_INTERVAL:
+            self.publish(processed, submitted)
+    
+    def publish(self, processed: int, submitted: int):
+        """Score the copy trades seen so far and publish the top followers"""
+        self.last_published = time.monotonic()
+        df = pd.DataFrame(self.rows, columns=['lead_index', 'token', 'follower_addr', 'delay_slots'])
         
-        # Step 5: Calculate follower scores
-        scores_result = calculate_follower_scores(wallet_address, copy_trades_df)
+        cleaned_df = clean_copy_trades(df)
+        metrics = calculate_follower_metrics(cleaned_df) if not cleaned_df.empty else cleaned_df
+        if not metrics.empty:
+            metrics = normalize_metrics(metrics, cleaned_df['lead_index'].nunique())
+            metrics = calculate_scores(metrics).sort_values('score', ascending=False)
         
-        return ProgressResponse(
-            status="success",
-            message=f"Processed wallet {wallet_address}: Found {scores_result['total_followers']} copy traders following this wallet",
-            data={
-                "wallet_address": wallet_address,
-                "transactions_fetched": fetch_result["transactions_fetched"],
-                "buy_transactions": filter_result["buy_transactions"],
-                "buy_percentage": filter_result["buy_percentage"],
-                "swaps_processed": swaps_result["filtered_transactions_processed"],
-                "tokens_with_swaps": swaps_result["tokens_with_swaps"],
-                "total_swaps_found": swaps_result["total_swaps_found"],
-                "copy_trades": {
-                    "total": analysis_result["total_copy_trades"],
-                    "unique_lead_transactions": analysis_result["unique_lead_transactions"],
-                    "unique_followers": analysis_result["unique_followers"],
-                    "unique_tokens": analysis_result["unique_tokens"],
-                    "delay_stats": analysis_result["delay_stats"]
-                },
-                "follower_scores": scores_result["follower_scores"],
-                "tier_distribution": scores_result.get("tier_distribution", {})
+        self.job.publish("scores", {
+            "provisional": True,
+            "windows_processed": processed,
+            "windows_submitted": submitted,
+            "total_followers": len(metrics),
+            "follower_scores": metrics.head(PROVISIONAL_TOP_FOLLOWERS).round(3).to_dict('records')
+        })
+
+def run_wallet_pipeline(job: Job):
+    """
+    Run the whole analysis for job.wallet_address while holding the wallet's
+    cross-process data lock, so that analyses of the same wallet in other
+    server processes never write into its data directory concurrently
+    """
+    wallet_dir = ensure_wallet_data_dirs(job.wallet_address)["wallet_dir"]
+    lock = FileLock(os.path.join(wallet_dir, ".lock"))
+    
+    if not lock.acquire(blocking=False):
+        # Another process is analyzing this wallet. Once it is done, this run
+        # is incremental and only fetches what that run has not stored yet.
+        job.publish("waiting", {"message": "Waiting for another analysis of this wallet to finish"})
+        lock.acquire()
+    
+    try:
+        analyze_wallet(job)
+    finally:
+        lock.release()
+
+def analyze_wallet(job: Job):
+    """
+    Run the whole analysis for job.wallet_address, reporting each step on the job
+    """
+    wallet_address = job.wallet_address
+    scorer = ProvisionalScorer(job, ensure_wallet_data_dirs(wallet_address)["token_swaps_dir"])
+    
+    try:
+        if STREAMING_INGESTION:
+            # Steps 1-3: Fetch, filter and fetch swaps in one streaming pass
+            job.start_steps("fetch_transactions", "filter_transactions", "fetch_swaps")
+            fetch_result, filter_result, swaps_result = run_streaming_ingestion(wallet_address, scorer.on_window)
+        else:
+            # Step 1: Fetch transactions
+            job.start_steps("fetch_transactions")
+            fetch_result = fetch_and_save_transactions(wallet_address)
+            
+            # Step 2: Filter transactions
+            job.start_steps("filter_transactions")
+            filter_result = filter_transactions(wallet_address)
+            
+            # Step 3: Fetch swaps for filtered transactions
+            job.start_steps("fetch_swaps")
+            swaps_result = fetch_swaps_for_filtered_transactions(wallet_address, on_window=scorer.on_window)
+    finally:
+        scorer.close()
+    
+    # Step 4: Analyze copy trades
+    job.start_steps("analyze_copy_trades")
+    analysis_result, copy_trades_df = analyze_copy_trades(wallet_address)
+    
+    # Step 5: Calculate follower scores
+    job.start_steps("calculate_scores")
+    scores_result = calculate_follower_scores(wallet_address, copy_trades_df)
+    
+    logger.info(f"HTTP connection stats: {get_http_client().stats()}")
+    
+    job.complete(
+        message=f"Processed wallet {wallet_address}: Found {scores_result['total_followers']} copy traders following this wallet",
+        data={
+            "wallet_address": wallet_address,
+            "transactions_fetched": fetch_result["transactions_fetched"],
+            "transactions_stored": fetch_result["transactions_stored"],
+            "buy_transactions": filter_result["buy_transactions"],
+            "buy_percentage": filter_result["buy_percentage"],
+            "swaps_processed": swaps_result["filtered_transactions_processed"],
+            "swap_windows_reused": swaps_result["windows_reused"],
+            "tokens_with_swaps": swaps_result["tokens_with_swaps"],
+            "total_swaps_found": swaps_result["total_swaps_found"],
+            "copy_trades": {
+                "total": analysis_result["total_copy_trades"],
+                "unique_lead_transactions": analysis_result["unique_lead_transactions"],
+                "unique_followers": analysis_result["unique_followers"],
+                "unique_tokens": analysis_result["unique_tokens"],
+                "delay_stats": analysis_result["delay_stats"]
             },
-            current_step="calculate_scores",
-            next_step=None,
-            progress={
-                "fetch_transactions": "completed",
-                "filter_transactions": "completed",
-                "fetch_swaps": "completed",
-                "analyze_copy_trades": "completed",
-                "calculate_scores": "completed"
-            }
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing wallet: {str(e)}")
+            "follower_scores": scores_result["follower_scores"],
+            "tier_distribution": scores_result.get("tier_distribution", {})
+        }
+    )
+
+# Main API endpoints
+@app.post("/process-wallet", response_model=ProgressResponse, status_code=202)
+async def process_wallet(request: WalletRequest):
+    """
+    Start processing a wallet address in the background.
+    Returns immediately with a job ID to poll at GET /jobs/{job_id}. If the
+    wallet is already being analyzed, the running job is returned instead.
+    """
+    job, created = job_manager.submit(request.wallet_address, run_wallet_pipeline)
+    if created:
+        logger.info(f"Submitted job {job.id} for wallet {request.wallet_address}")
+    else:
+        logger.info(f"Attached to running job {job.id} for wallet {request.wallet_address}")
+    return ProgressResponse(**job.snapshot())
+
+def page_scores(scores: List[Dict[str, Any]], sort_by: str, order: Optional[str], tier: Optional[str],
+                limit: Optional[int], cursor: Optional[str], top_k: Optional[int]) -> Dict[str, Any]:
+    """page_follower_scores for an endpoint, reporting bad parameters as 400"""
+    try:
+        return page_follower_scores(scores, sort_by, order, tier, limit, cursor, top_k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/jobs/{job_id}", response_model=ProgressResponse)
+async def get_job(job_id: str, sort_by: Optional[str] = None, order: Optional[str] = None,
+                  tier: Optional[str] = None, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                  cursor: Optional[str] = None, top_k: Optional[int] = Query(None, ge=1)):
+    """
+    Get the status, step progress and (once finished) the results of a job.
+    The follower scores of a finished job are returned in full unless any of
+    the paging parameters (sort_by, order, tier, limit, cursor, top_k) is given.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    snapshot = job.snapshot()
+    paging = (sort_by, order, tier, limit, cursor, top_k)
+    if "follower_scores" in snapshot["data"] and any(value is not None for value in paging):
+        page = page_scores(snapshot["data"]["follower_scores"], sort_by or "score", *paging[1:])
+        snapshot["data"] = {**snapshot["data"], **page}
+    
+    return ProgressResponse(**snapshot)
+
+@app.get("/jobs/{job_id}/events")
+def stream_job_events(job_id: str, request: Request):
+    """
+    Server-sent events for a job: "progress" on step transitions, "swaps" per
+    finished swap window, "scores" with provisional top followers, and a
+    final "completed" or "failed". Supports resuming via Last-Event-ID.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    last_event_id = request.headers.get("last-event-id")
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    
+    def event_stream():
+        index = start
+        while True:
+            events = job.wait_for_events(index, timeout=15)
+            if not events:
+                if job.finished:
+                    return
+                # Comment line keeps idle connections (and proxies) alive
+                yield ": keep-alive\n\n"
+                continue
+            
+            for event in events:
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {dumps_str(event['data'])}\n\n"
+            index = events[-1]["id"] + 1
+    
+    # An explicit Content-Encoding keeps older GZipMiddleware versions from buffering events
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "Content-Encoding": "identity"})
+
+@app.get("/wallets/{wallet_address}/scores")
+def get_wallet_scores(wallet_address: str, request: Request, sort_by: str = "score",
+                      order: Optional[str] = None, tier: Optional[str] = None,
+                      limit: int = Query(SCORES_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                      cursor: Optional[str] = None, top_k: Optional[int] = Query(None, ge=1)):
+    """
+    Serve one page of the latest persisted follower scores of a wallet.
+    A missing snapshot starts an analysis (202); a stale one is still served
+    while a re-analysis runs in the background. Supports If-None-Match.
+    """
+    snapshot = score_cache.get(wallet_address)
+    
+    if snapshot is None:
+        job, _ = job_manager.submit(wallet_address, run_wallet_pipeline)
+        return DefaultJSONResponse(status_code=202, content={
+            "wallet_address": wallet_address,
+            "status": "computing",
+            "job_id": job.id,
+        })
+    
+    stale = time.time() - snapshot["computed_at"] > SCORES_MAX_AGE_SECONDS
+    job_id = None
+    if stale:
+        job, _ = job_manager.submit(wallet_address, run_wallet_pipeline)
+        job_id = job.id
+    
+    headers = {"ETag": snapshot["etag"], "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == snapshot["etag"]:
+        return Response(status_code=304, headers=headers)
+    
+    page = page_scores(snapshot["follower_scores"], sort_by, order, tier, limit, cursor, top_k)
+    
+    return DefaultJSONResponse(headers=headers, content={
+        "wallet_address": wallet_address,
+        "status": "stale" if stale else "fresh",
+        "job_id": job_id,
+        "computed_at": datetime.fromtimestamp(snapshot["computed_at"]).isoformat(),
+        "tier_distribution": snapshot["tier_distribution"],
+        **page,
+    })
+
+@app.post("/wallets/{wallet_address}/backtest")
+def backtest_scoring(wallet_address: str, request: BacktestRequest):
+    """
+    Score the latest copy trades table of a wallet under every combination
+    of the given windows, min_hits, weights and tier boundaries, and report
+    each setting's tier distribution and follower churn against the
+    default scoring parameters. No data is fetched.
+    """
+    grid = []
+    try:
+        for window in request.windows:
+            for min_hits in request.min_hits:
+                for weights in request.weights:
+                    for tier_boundaries in request.tier_boundaries:
+                        grid.append(ScoringParams(
+                            window=window, min_hits=min_hits, freq_weight=weights.freq,
+                            speed_weight=weights.speed, breadth_weight=weights.breadth,
+                            tier_boundaries=tier_boundaries
+                        ))
+                        if len(grid) > MAX_BACKTEST_SETTINGS:
+                            raise ValueError(f"At most {MAX_BACKTEST_SETTINGS} settings can be evaluated at once")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    copy_trades_dir = os.path.join(os.path.dirname(__file__), "data", wallet_address, "copy_trades")
+    parquet_path = latest_snapshot(copy_trades_dir, "copy_trades")
+    if parquet_path is None:
+        raise HTTPException(status_code=404, detail=f"No copy trades for wallet {wallet_address}; analyze it first")
+    
+    # Address columns are read as categoricals instead of one string per row
+    copy_trades_df = pq.read_table(
+        parquet_path, columns=['lead_index', 'token', 'follower_addr', 'delay_slots'],
+        read_dictionary=['lead_index', 'token', 'follower_addr']
+    ).to_pandas()
+    
+    # The baseline is scored in the same pass as the grid
+    baseline, *results = scoring.score_grid(copy_trades_df, [SCORING_PARAMS] + grid)
+    baseline_tiers = pd.Series(baseline['tier'].to_numpy(), index=baseline['addr'])
+    
+    settings = []
+    for params, metrics in zip(grid, results):
+        tiers = pd.Series(metrics['tier'].to_numpy(), index=metrics['addr'])
+        common = tiers.index.intersection(baseline_tiers.index)
+        settings.append({
+            "params": params.model_dump(),
+            "total_followers": len(metrics),
+            "tier_distribution": tiers.value_counts().to_dict(),
+            "churn": {
+                "added": len(tiers.index.difference(baseline_tiers.index)),
+                "removed": len(baseline_tiers.index.difference(tiers.index)),
+                "tier_changed": int((tiers[common] != baseline_tiers[common]).sum()),
+            },
+        })
+    
+    return {
+        "wallet_address": wallet_address,
+        "copy_trades": len(copy_trades_df),
+        "baseline": {
+            "params": SCORING_PARAMS.model_dump(),
+            "total_followers": len(baseline),
+            "tier_distribution": baseline_tiers.value_counts().to_dict(),
+        },
+        "settings": settings,
+    }
+
+# Snapshot tables that can be exported and the directory (relative to the wallet's) they live in
+EXPORT_TABLES = {
+    "copy_trades": "copy_trades",
+    "follower_scores": "",
+}
+EXPORT_MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "csv": "text/csv",
+    "json": "application/json",
+}
+
+@app.get("/wallets/{wallet_address}/exports/{table}")
+def export_wallet_table(wallet_address: str, table: str, format: str = "csv"):
+    """
+    Download the latest copy_trades or follower_scores snapshot of a wallet
+    as parquet, csv or json. Non-Parquet files are produced on first request.
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table {table}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    
+    directory = os.path.join(os.path.dirname(__file__), "data", wallet_address, EXPORT_TABLES[table])
+    parquet_path = latest_snapshot(directory, table)
+    if parquet_path is None:
+        raise HTTPException(status_code=404, detail=f"No {table} snapshot for wallet {wallet_address}")
+    
+    path = export_snapshot(parquet_path, format)
+    return FileResponse(path, media_type=EXPORT_MEDIA_TYPES[format], filename=os.path.basename(path))
+
+@app.get("/followers/{follower_address}/leaders")
+def get_follower_leaders(follower_address: str):
+    """Every analyzed leader a wallet copies, with its hits, score and tier"""
+    leaders = follower_index.follower_leaders(follower_address)
+    return {
+        "follower_address": follower_address,
+        "total_leaders": len(leaders),
+        "leaders": leaders,
+    }
+
+@app.get("/wallets/{wallet_address}/overlap")
+def get_leader_overlap(wallet_address: str, limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE)):
+    """Analyzed leaders sharing the most followers with a wallet"""
+    matrix = follower_index.matrix()
+    return {
+        "wallet_address": wallet_address,
+        "overlap": matrix.leader_overlap(wallet_address, limit),
+    }
+
+@app.get("/follower-clusters")
+def get_follower_clusters(min_leaders: int = Query(2, ge=1), min_shared: int = Query(2, ge=1),
+                          min_size: int = Query(2, ge=2), limit: int = Query(SCORES_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)):
+    """
+    Groups of followers that copy the same leaders: followers of at least
+    min_leaders analyzed leaders, linked when they share min_shared of them
+    """
+    matrix = follower_index.matrix()
+    try:
+        clusters = matrix.clusters(min_leaders, min_shared, min_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "total_leaders": len(matrix.leaders),
+        "total_followers": len(matrix.followers),
+        "total_clusters": len(clusters),
+        "clusters": clusters[:limit],
+    }
 
 @app.get("/")
 async def root():
     """Root endpoint for health check"""
     return {"status": "healthy", "message": "Copy Trader API is running"}
 
+@app.get("/http-stats")
+async def http_stats():
+    """Per-host connection reuse statistics of the shared HTTP client"""
+    return {"hosts": get_http_client().stats(), "swap_cache": swap_cache.stats(),
+            "swap_file_cache": swap_file_cache.stats(),
+            "score_cache": score_cache.stats()}
+
 @app.post("/get-copy-transactions", response_model=CopyTransactionsResponse)
-async def get_copy_transactions(request: CopyTransactionRequest):
+def get_copy_transactions(request: CopyTransactionRequest):
     """
     Get copy transactions between a target wallet and a follower wallet
     """
@@ -819,147 +1672,77 @@ async def get_copy_transactions(request: CopyTransactionRequest):
     
     logger.info(f"Processing copy transactions request for target wallet: {target_wallet} and follower wallet: {follower_wallet}")
     
+    if request.limit is not None and not 1 <= request.limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    
+    after_position = 0
+    if request.cursor:
+        try:
+            after_position = decode_position_cursor(request.cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        # Get paths to directories
-        dirs = ensure_wallet_data_dirs(target_wallet)
-        copy_trades_dir = dirs["copy_trades_dir"]
-        token_swaps_dir = dirs["token_swaps_dir"]
-        
-        logger.info(f"Looking for copy trades in: {copy_trades_dir}")
-        
-        # Get all copy_trades JSON files
-        copy_trades_files = glob.glob(os.path.join(copy_trades_dir, "*.json"))
-        
-        if not copy_trades_files:
-            logger.warning(f"No copy trades files found for wallet: {target_wallet}")
-            return CopyTransactionsResponse(transactions=[])
-        
-        # Sort files by modification time (newest first)
-        copy_trades_files.sort(key=os.path.getmtime, reverse=True)
+        store = get_copy_trade_store(target_wallet)
         
-        # Use the most recent file
-        latest_file = copy_trades_files[0]
-        logger.info(f"Using most recent copy trades file: {latest_file}")
-        
-        # Load the copy trades data
-        with open(latest_file, 'r') as f:
-            copy_trades_data = json.load(f)
-        
-        # Filter for the specific follower wallet
-        follower_trades = [trade for trade in copy_trades_data 
-                          if trade.get('follower_addr') == follower_wallet]
-        
-        logger.info(f"Found {len(follower_trades)} copy trades for follower wallet: {follower_wallet}")
-        
-        # Deduplicate by creating a unique key for each transaction
-        unique_trades = {}
-        for trade in follower_trades:
-            # Create a unique key using token, lead signature, and follower slot
-            unique_key = f"{trade.get('token')}_{trade.get('lead_index')[:8]}_{trade.get('follower_slot')}"
+        if not store.exists():
+            # Wallets analyzed before the store existed: build it once from their data
+            copy_trades_dir = ensure_wallet_data_dirs(target_wallet)["copy_trades_dir"]
+            if latest_snapshot(copy_trades_dir, "copy_trades") is None:
+                logger.warning(f"No copy trades files found for wallet: {target_wallet}")
+                return CopyTransactionsResponse(transactions=[])
             
-            # Only keep one entry for each unique transaction
-            if unique_key not in unique_trades:
-                unique_trades[unique_key] = trade
+            logger.info(f"Building copy trade store for wallet: {target_wallet}")
+            _, store = build_copy_trade_store(target_wallet)
         
-        logger.info(f"After deduplication: {len(unique_trades)} unique copy trades")
+        # One indexed query returns the de-duplicated trades joined with both swap records;
+        # one row beyond the page tells whether another page follows
+        trades = store.follower_trades(follower_wallet, after_position,
+                                       request.limit + 1 if request.limit is not None else None)
+        next_cursor = None
+        if request.limit is not None and len(trades) > request.limit:
+            trades = trades[:request.limit]
+            next_cursor = encode_cursor([trades[-1]['position']])
+        logger.info(f"Found {len(trades)} unique copy trades for follower wallet: {follower_wallet}")
         
         transactions = []
         
-        # Use the deduplicated trades
-        for trade in unique_trades.values():
-            token_mint = trade.get('token')
-            lead_signature = trade.get('lead_index')
-            lead_slot = trade.get('lead_slot')
-            follower_slot = trade.get('follower_slot')
-            delay_slots = trade.get('delay_slots')
-            timestamp = trade.get('timestamp')
-            
-            logger.info(f"Processing trade for token: {token_mint}, lead signature: {lead_signature[:8]}...")
-            
-            # Find the corresponding token swaps file
-            # Format: swaps_{token_mint[:8]}_{lead_signature[:8]}.json
-            swap_file_pattern = f"swaps_{token_mint[:8]}_{lead_signature[:8]}*.json"
-            swap_files = glob.glob(os.path.join(token_swaps_dir, swap_file_pattern))
-            
-            if not swap_files:
-                logger.warning(f"No swap file found for token: {token_mint} and signature: {lead_signature[:8]}")
-                continue
-            
-            swap_file = swap_files[0]
-            logger.info(f"Found swap file: {swap_file}")
-            
-            # Load the swap data
-            with open(swap_file, 'r') as f:
-                swap_data = json.load(f)
-            
-            # Find leader transaction
-            leader_tx = None
-            for result in swap_data.get('result', []):
-                # Just a simple check - the leader transaction will have the exact signature
-                if result.get('transactionHash') == lead_signature:
-                    leader_tx = result
-                    break
-            
-            # Find follower transaction
-            follower_tx = None
-            for result in swap_data.get('result', []):
-                if result.get('walletAddress') == follower_wallet and result.get('blockNumber') == follower_slot:
-                    follower_tx = result
-                    break
-            
-            if not leader_tx or not follower_tx:
-                logger.warning(f"Could not find both leader and follower transactions for token: {token_mint}")
-                continue
-            
-            # Extract token info from leader transaction
-            token_info = None
-            if 'bought' in leader_tx and leader_tx['transactionType'] == 'buy':
-                bought = leader_tx['bought']
+        for trade in trades:
+            token_info = TokenInfo(
+                address=trade['bought_address'] or '',
+                name=trade['bought_name'] or '',
+                symbol=trade['bought_symbol'] or '',
                 # Make sure logo is never None by defaulting to empty string
-                logo = bought.get('logo', '')
-                if logo is None:
-                    logo = ''
-                token_info = TokenInfo(
-                    address=bought.get('address', ''),
-                    name=bought.get('name', ''),
-                    symbol=bought.get('symbol', ''),
-                    logo=logo
-                )
-            
-            if not token_info:
-                logger.warning(f"Could not extract token info for token: {token_mint}")
-                continue
+                logo=trade['bought_logo'] or ''
+            )
             
             # Extract leader transaction info
             leader_transaction = TransactionInfo(
-                slot=lead_slot,
-                timestamp=timestamp,
-                signature=lead_signature,
-                amount=leader_tx.get('bought', {}).get('amount', '0'),
-                usd_amount=leader_tx.get('bought', {}).get('usdAmount', 0)
+                slot=trade['lead_slot'],
+                timestamp=trade['timestamp'],
+                signature=trade['lead_index'],
+                amount=trade['lead_amount'] or '0',
+                usd_amount=trade['lead_usd_amount'] or 0
             )
             
             # Extract follower transaction info
             follower_transaction = TransactionInfo(
-                slot=follower_slot,
-                timestamp=timestamp,  # Using the same timestamp for simplicity
-                signature=follower_tx.get('transactionHash', ''),
-                amount=follower_tx.get('bought', {}).get('amount', '0'),
-                usd_amount=follower_tx.get('bought', {}).get('usdAmount', 0)
+                slot=trade['follower_slot'],
+                timestamp=trade['timestamp'],  # Using the same timestamp for simplicity
+                signature=trade['follower_signature'] or '',
+                amount=trade['follower_amount'] or '0',
+                usd_amount=trade['follower_usd_amount'] or 0
             )
             
             # Create a copy transaction object
-            copy_transaction = CopyTransaction(
+            transactions.append(CopyTransaction(
                 token=token_info,
                 leader_transaction=leader_transaction,
                 follower_transaction=follower_transaction,
-                delay_slots=delay_slots
-            )
-            
-            transactions.append(copy_transaction)
-            logger.info(f"Added copy transaction for token: {token_info.symbol}")
+                delay_slots=trade['delay_slots']
+            ))
         
-        return CopyTransactionsResponse(transactions=transactions)
+        return CopyTransactionsResponse(transactions=transactions, next_cursor=next_cursor)
     
     except Exception as e:
         logger.error(f"Error processing copy transactions: {str(e)}", exc_info=True)
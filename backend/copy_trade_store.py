@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+from swap_records import SwapRecord
+
+# Flattened swap fields kept for the copy-transaction drill-down
+SWAP_DETAIL_COLUMNS = [
+    'transaction_hash', 'transaction_type', 'has_bought', 'bought_address',
+    'bought_name', 'bought_symbol', 'bought_logo', 'bought_amount', 'bought_usd_amount'
+]
+
+SCHEMA = """
+CREATE TABLE copy_trades (
+    lead_index TEXT NOT NULL,
+    token TEXT NOT NULL,
+    follower_addr TEXT NOT NULL,
+    delay_slots INTEGER NOT NULL,
+    lead_slot INTEGER NOT NULL,
+    follower_slot INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL
+);
+CREATE TABLE swaps (
+    lead_index TEXT NOT NULL,
+    wallet_address TEXT,
+    block_number INTEGER,
+    transaction_hash TEXT,
+    transaction_type TEXT,
+    has_bought INTEGER NOT NULL,
+    bought_address TEXT,
+    bought_name TEXT,
+    bought_symbol TEXT,
+    bought_logo TEXT,
+    bought_amount TEXT,
+    bought_usd_amount REAL
+);
+CREATE INDEX copy_trades_follower ON copy_trades (follower_addr);
+CREATE INDEX copy_trades_lead_follower_slot ON copy_trades (lead_index, follower_slot);
+CREATE INDEX swaps_lead_hash ON swaps (lead_index, transaction_hash);
+CREATE INDEX swaps_lead_wallet_block ON swaps (lead_index, wallet_address, block_number);
+"""
+
+# One row per distinct (token, lead signature prefix, follower slot) of a
+# follower, joined with the first matching leader and follower swap records
+# of the lead's swap window (rowids follow table and file order)
+FOLLOWER_TRADES_QUERY = """
+SELECT c.rowid AS position, c.lead_index, c.token, c.lead_slot, c.follower_slot, c.delay_slots, c.timestamp,
+       l.bought_address, l.bought_name, l.bought_symbol, l.bought_logo,
+       l.bought_amount AS lead_amount, l.bought_usd_amount AS lead_usd_amount,
+       f.transaction_hash AS follower_signature,
+       f.bought_amount AS follower_amount, f.bought_usd_amount AS follower_usd_amount
+FROM copy_trades c
+JOIN swaps l ON l.rowid = (
+    SELECT MIN(rowid) FROM swaps
+    WHERE lead_index = c.lead_index AND transaction_hash = c.lead_index)
+JOIN swaps f ON f.rowid = (
+    SELECT MIN(rowid) FROM swaps
+    WHERE lead_index = c.lead_index AND wallet_address = c.follower_addr
+      AND block_number = c.follower_slot)
+WHERE c.rowid IN (
+    SELECT MIN(rowid) FROM copy_trades WHERE follower_addr = ?
+    GROUP BY token, substr(lead_index, 1, 8), follower_slot)
+  AND c.rowid > ?
+  AND l.transaction_type = 'buy' AND l.has_bought = 1
+ORDER BY c.rowid
+LIMIT ?
+"""
+
+
+def flatten_swap(swap: SwapRecord) -> Tuple:
+    """Values of SWAP_DETAIL_COLUMNS for a swap record"""
+    return (
+        swap.transaction_hash,
+        swap.transaction_type,
+        int(swap.has_bought),
+        swap.bought_address,
+        swap.bought_name,
+        swap.bought_symbol,
+        swap.bought_logo,
+        swap.bought_amount,
+        swap.bought_usd_amount,
+    )
+
+
+class CopyTradeStore:
+    """
+    Indexed SQLite copy of a wallet's latest copy-trade table together with
+    the swap records it was built from, so a follower's copy transactions
+    (with leader and follower swap details) come from a single indexed query.
+    The database is rebuilt as a whole after every analysis and swapped in
+    atomically, so readers never see a partially written store.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.db_path)
+
+    def rebuild(self, copy_trades: pd.DataFrame, swaps: pd.DataFrame):
+        """
+        Replace the store with the given copy-trade table and swap records
+        (lead_index, follower_addr, follower_slot plus SWAP_DETAIL_COLUMNS)
+        """
+        tmp_path = f"{self.db_path}.{uuid.uuid4().hex}.tmp"
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript(SCHEMA)
+            conn.executemany(
+                "INSERT INTO copy_trades VALUES (?, ?, ?, ?, ?, ?, ?)",
+                copy_trades[['lead_index', 'token', 'follower_addr', 'delay_slots',
+                             'lead_slot', 'follower_slot', 'timestamp']]
+                .astype(object).itertuples(index=False, name=None)
+            )
+            swap_rows = swaps[['lead_index', 'follower_addr', 'follower_slot'] + SWAP_DETAIL_COLUMNS].astype(object)
+            conn.executemany(
+                "INSERT INTO swaps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                swap_rows.where(swap_rows.notna(), None).itertuples(index=False, name=None)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, self.db_path)
+
+    def follower_trades(self, follower_addr: str, after_position: int = 0,
+                        limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        De-duplicated copy trades of one follower with leader/follower swap
+        details, in table order. Each row has a "position"; pass the last one
+        as after_position to continue with the next rows.
+        """
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            conn.row_factory = sqlite3.Row
+            params = (follower_addr, after_position, -1 if limit is None else limit)
+            return [dict(row) for row in conn.execute(FOLLOWER_TRADES_QUERY, params)]
+        finally:
+            conn.close()
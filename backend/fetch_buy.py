@@ -1,9 +1,10 @@
 import requests
-import time
 import json
 import os
 from typing import List, Dict, Any
 
+from http_client import get_http_client
+
 #given wallet address, fetch last 500 SWAP and TRANSFER transactions
 
 
@@ -54,12 +55,10 @@ def fetch_transactions(before_signature: str = None) -> List[Dict[Any, Any]]:
         params["before"] = before_signature
     
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        return get_http_client().get_json(url, params=params)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching transactions: {e}")
-        return []
+        raise
 
 def main():
     # Ensure transactions directory exists
@@ -86,9 +85,6 @@ def main():
         if transactions:
             last_signature = transactions[-1].get("signature")
         
-        # Add a small delay to avoid rate limiting
-        time.sleep(0.5)
-        
         print(f"Fetched and saved {len(all_transactions)} transactions so far...")
     
     # Trim to exact number needed
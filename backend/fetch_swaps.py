@@ -5,6 +5,8 @@ from datetime import datetime
 import os
 import glob
 
+from http_client import get_http_client
+
 
 #given token address and timestamp, fetch all swaps for that token address and from when target wallet buys to 2 seconds later. 
 
@@ -44,7 +46,6 @@ def fetch_token_swaps(token_address: str, from_date: int, to_date: int, cursor:
         url += "?" + "&".join(params)
     
     headers = {
-        "Accept": "application/json",
         "X-API-Key": MORALIS_API_KEY
     }
     
@@ -56,8 +57,9 @@ def fetch_token_swaps(token_address: str, from_date: int, to_date: int, cursor:
         if cursor:
             print(f"- cursor: {cursor}")
         
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        client = get_http_client()
+        response = client.get(url, headers=headers)
+        client.check_status(response, url)
         data = response.json()
         
         print(f"\nResponse status: {response.status_code}")
@@ -66,7 +68,7 @@ def fetch_token_swaps(token_address: str, from_date: int, to_date: int, cursor:
         return data
     except requests.exceptions.RequestException as e:
         print(f"Error fetching swaps: {e}")
-        return {}
+        raise
 
 def fetch_all_swaps(token_address: str, from_date: int, to_date: int) -> List[Dict[Any, Any]]:
     """
@@ -0,0 +1,158 @@
+import os
+from typing import Dict, Any, Iterable, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from address_dictionary import AddressDictionary
+from scoring import median_delays
+from serialization import dumps, loads
+
+METADATA_KEY = b"follower_aggregates"
+
+
+def _encode_sets(sets: List[Iterable[str]], dictionary: AddressDictionary) -> List[Set[int]]:
+    """Sets of strings as sets of dictionary codes, encoding all values in one call"""
+    sizes = [len(values) for values in sets]
+    codes = dictionary.encode([value for values in sets for value in values]).tolist()
+    bounds = np.cumsum([0] + sizes)
+    return [set(codes[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def _decode_sets(sets: List[Set[int]], dictionary: AddressDictionary) -> List[List[str]]:
+    """Sets of dictionary codes as sorted lists of strings, decoding all codes in one call"""
+    sizes = [len(codes) for codes in sets]
+    values = dictionary.decode([code for codes in sets for code in codes]).tolist()
+    bounds = np.cumsum([0] + sizes)
+    return [sorted(values[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+class FollowerAggregates:
+    """
+    Per-leader follower aggregates that can be updated with new copy trades.
+
+    For every follower it keeps a histogram of copy-trade delays over
+    0..window (from which hits, delay sum, mean and exact median follow) and
+    the set of tokens copied. It also remembers which lead buys were folded
+    in and how many of them had at least one copy trade within the window,
+    so new rows are only ever added once.
+
+    Followers, tokens and leads are address_dictionary codes in memory, as
+    in the coded copy-trade table; the file stores the strings.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.addrs: List[int] = []
+        self.histograms = np.zeros((0, window + 1), dtype=np.int64)
+        self.tokens: List[Set[int]] = []
+        self.leads: Set[int] = set()
+        self.counted_leads = 0
+        self._positions: Dict[int, int] = {}
+
+    def copy(self) -> "FollowerAggregates":
+        other = FollowerAggregates(self.window)
+        other.addrs = list(self.addrs)
+        other.histograms = self.histograms.copy()
+        other.tokens = [set(tokens) for tokens in self.tokens]
+        other.leads = set(self.leads)
+        other.counted_leads = self.counted_leads
+        other._positions = dict(self._positions)
+        return other
+
+    def update(self, copy_trades: pd.DataFrame):
+        """
+        Fold in the coded copy trades (lead_index, token, follower_addr,
+        delay_slots) of lead buys not seen before; rows of already folded
+        leads are ignored
+        """
+        rows = copy_trades[~copy_trades['lead_index'].isin(self.leads)]
+        new_leads = set(rows['lead_index'].unique().tolist())
+        if not new_leads:
+            return
+
+        rows = rows[(rows['delay_slots'] >= 0) & (rows['delay_slots'] <= self.window)]
+        self.leads |= new_leads
+        self.counted_leads += rows['lead_index'].nunique()
+        if rows.empty:
+            return
+
+        codes, followers = pd.factorize(rows['follower_addr'])
+        followers = followers.tolist()
+        new_addrs = [addr for addr in followers if addr not in self._positions]
+        for addr in new_addrs:
+            self._positions[addr] = len(self.addrs)
+            self.addrs.append(addr)
+            self.tokens.append(set())
+        if new_addrs:
+            self.histograms = np.vstack([
+                self.histograms, np.zeros((len(new_addrs), self.window + 1), dtype=np.int64)
+            ])
+
+        positions = np.array([self._positions[addr] for addr in followers])[codes]
+        np.add.at(self.histograms, (positions, rows['delay_slots'].to_numpy(dtype=np.int64)), 1)
+
+        for position, tokens in pd.Series(rows['token'].to_numpy()).groupby(positions).unique().items():
+            self.tokens[position].update(tokens.tolist())
+
+    def metrics(self, min_hits: int) -> Tuple[pd.DataFrame, int]:
+        """
+        hits, breadth and average/median delay of every follower with at
+        least min_hits copy trades (addr as codes), and the number of lead
+        buys with at least one copy trade
+        """
+        hits = self.histograms.sum(axis=1)
+        selected = np.flatnonzero(hits >= max(min_hits, 1))
+        hits = hits[selected]
+        histograms = self.histograms[selected]
+
+        metrics = pd.DataFrame({
+            'addr': np.array(self.addrs, dtype=np.int64)[selected],
+            'hits': hits,
+            'breadth': np.array([len(self.tokens[i]) for i in selected], dtype=np.int64),
+            'avg_delay': (histograms * np.arange(self.window + 1)).sum(axis=1) / np.maximum(hits, 1),
+            'med_delay': median_delays(histograms.cumsum(axis=1), hits),
+        })
+        return metrics, self.counted_leads
+
+    def save(self, path: str, dictionary: AddressDictionary):
+        """Write the aggregates to a single Parquet file (atomically)"""
+        table = pa.table({
+            'addr': pa.array(dictionary.decode(self.addrs).tolist(), type=pa.string()),
+            'histogram': pa.array(self.histograms.tolist(), type=pa.list_(pa.int64())),
+            'tokens': pa.array(_decode_sets(self.tokens, dictionary), type=pa.list_(pa.string())),
+        })
+        metadata: Dict[str, Any] = {
+            "window": self.window,
+            "counted_leads": self.counted_leads,
+            "leads": sorted(dictionary.decode(list(self.leads)).tolist()),
+        }
+        table = table.replace_schema_metadata({METADATA_KEY: dumps(metadata)})
+
+        tmp_path = path + ".tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, window: int, dictionary: AddressDictionary) -> "FollowerAggregates":
+        """Aggregates saved at path, or empty ones if missing or built for another window"""
+        aggregates = cls(window)
+        if not os.path.exists(path):
+            return aggregates
+
+        table = pq.read_table(path)
+        metadata = loads((table.schema.metadata or {}).get(METADATA_KEY, b"{}"))
+        if metadata.get("window") != window:
+            return aggregates
+
+        aggregates.addrs = dictionary.encode(table.column('addr').to_pylist()).tolist()
+        aggregates._positions = {addr: i for i, addr in enumerate(aggregates.addrs)}
+        histograms = table.column('histogram').to_pylist()
+        if histograms:
+            aggregates.histograms = np.array(histograms, dtype=np.int64)
+        aggregates.tokens = _encode_sets(table.column('tokens').to_pylist(), dictionary)
+        aggregates.leads = set(dictionary.encode(metadata["leads"]).tolist())
+        aggregates.counted_leads = metadata["counted_leads"]
+        return aggregates
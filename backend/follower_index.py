@@ -0,0 +1,283 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS follower_index (
+    follower_addr TEXT NOT NULL,
+    leader_addr TEXT NOT NULL,
+    hits INTEGER NOT NULL,
+    score REAL NOT NULL,
+    tier TEXT NOT NULL,
+    updated_at INTEGER NOT NULL,
+    PRIMARY KEY (leader_addr, follower_addr)
+);
+CREATE INDEX IF NOT EXISTS follower_index_follower ON follower_index (follower_addr);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Leaders with more followers are not used to link follower pairs in clusters
+MAX_PAIRED_FOLLOWERS = 1000
+# Most (follower, follower) entries one cluster query may expand
+MAX_CLUSTER_PAIRS = 20_000_000
+# Cluster results kept per matrix (least recently used are dropped)
+MAX_CACHED_CLUSTERS = 16
+
+
+def _connected_components(a: np.ndarray, b: np.ndarray, n: int) -> np.ndarray:
+    """Label of every node 0..n-1 of the graph with edges a[i]-b[i]: the smallest node of its component"""
+    # Repeatedly take the smallest label of each edge, then jump labels to their own labels
+    labels = np.arange(n)
+    while True:
+        lowest = np.minimum(labels[a], labels[b])
+        updated = labels.copy()
+        np.minimum.at(updated, a, lowest)
+        np.minimum.at(updated, b, lowest)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+class CoFollowingMatrix:
+    """
+    Sparse follower x leader incidence matrix in coordinate form: entry i
+    says follower followers[rows[i]] copies leader leaders[cols[i]].
+    """
+
+    def __init__(self, follower_addrs: np.ndarray, leader_addrs: np.ndarray,
+                 max_paired_followers: int = MAX_PAIRED_FOLLOWERS, max_pairs: int = MAX_CLUSTER_PAIRS):
+        self.max_paired_followers = max_paired_followers
+        self.max_pairs = max_pairs
+        self.rows, self.followers = pd.factorize(follower_addrs, sort=True)
+        self.cols, self.leaders = pd.factorize(leader_addrs, sort=True)
+        self.follower_degree = np.bincount(self.rows, minlength=len(self.followers))
+        self.leader_degree = np.bincount(self.cols, minlength=len(self.leaders))
+        self._leader_positions = {leader: i for i, leader in enumerate(self.leaders)}
+        self._clusters: "OrderedDict[Tuple[int, int, int], List[Dict[str, Any]]]" = OrderedDict()
+        self._clusters_lock = threading.Lock()
+
+    def leader_overlap(self, leader_addr: str, limit: int) -> List[Dict[str, Any]]:
+        """Leaders sharing the most followers with leader_addr"""
+        leader = self._leader_positions.get(leader_addr)
+        if leader is None:
+            return []
+
+        # One row of the leader x leader co-occurrence matrix
+        shared_by_follower = np.zeros(len(self.followers), dtype=bool)
+        shared_by_follower[self.rows[self.cols == leader]] = True
+        shared = np.bincount(self.cols[shared_by_follower[self.rows]], minlength=len(self.leaders))
+        shared[leader] = 0
+
+        others = np.flatnonzero(shared)
+        others = others[np.lexsort((others, -shared[others]))][:limit]
+        union = self.leader_degree[leader] + self.leader_degree[others] - shared[others]
+        return [
+            {
+                "leader": self.leaders[other],
+                "followers": int(self.leader_degree[other]),
+                "shared_followers": int(shared[other]),
+                "jaccard": round(float(shared[other] / union[i]), 3),
+            }
+            for i, other in enumerate(others)
+        ]
+
+    def clusters(self, min_leaders: int, min_shared: int, min_size: int) -> List[Dict[str, Any]]:
+        """
+        Groups of followers that co-follow the same leaders: followers of at
+        least min_leaders leaders are linked when they share min_shared of
+        them, and every connected group of at least min_size is a cluster.
+
+        With min_shared 1 this is linear in the index size; otherwise shared
+        leaders are counted per follower pair, which skips leaders with more
+        than max_paired_followers followers (see _linked_pairs). Raises
+        ValueError if the pairs to count exceed max_pairs.
+        """
+        key = (min_leaders, min_shared, min_size)
+        with self._clusters_lock:
+            if key in self._clusters:
+                self._clusters.move_to_end(key)
+                return self._clusters[key]
+
+        clusters = self._find_clusters(min_leaders, min_shared, min_size)
+        with self._clusters_lock:
+            self._clusters[key] = clusters
+            while len(self._clusters) > MAX_CACHED_CLUSTERS:
+                self._clusters.popitem(last=False)
+        return clusters
+
+    def _linked_pairs(self, entries: pd.DataFrame, min_shared: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Follower pairs sharing at least min_shared leaders. Pairs are counted
+        per leader, so a leader with n followers costs n^2; leaders with more
+        than max_paired_followers followers are left out of the count to
+        bound that cost (they still appear in cluster leader lists), and
+        ValueError is raised if the total exceeds max_pairs.
+        """
+        leader_sizes = np.bincount(entries['leader'].to_numpy(), minlength=len(self.leaders))
+        entries = entries[leader_sizes[entries['leader'].to_numpy()] <= self.max_paired_followers]
+        if entries.empty:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        paired_sizes = leader_sizes[leader_sizes <= self.max_paired_followers].astype(np.int64)
+        pairs = int((paired_sizes ** 2).sum())
+        if pairs > self.max_pairs:
+            raise ValueError(f"Clustering would count {pairs} follower pairs (at most {self.max_pairs}); "
+                             f"raise min_leaders or use min_shared=1")
+
+        # Follower x follower co-occurrence: every pair of followers of the same
+        # leader, packed into one int64 key and counted over all leaders
+        entries = entries.sort_values('leader', kind='stable')
+        followers = entries['follower'].to_numpy(dtype=np.int64)
+        leaders = entries['leader'].to_numpy()
+        leader_sizes = np.bincount(leaders)
+        # Entry i is paired with every entry of its leader's (contiguous) group
+        sizes = leader_sizes[leaders]
+        group_start = (np.cumsum(leader_sizes) - leader_sizes)[leaders]
+        left = np.repeat(np.arange(len(entries)), sizes)
+        right = np.repeat(group_start, sizes) + np.arange(len(left)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        left, right = followers[left], followers[right]
+        keys = left[left < right] * len(self.followers) + right[left < right]
+        keys, shared = np.unique(keys, return_counts=True)
+        return np.divmod(keys[shared >= min_shared], len(self.followers))
+
+    def _find_clusters(self, min_leaders: int, min_shared: int, min_size: int) -> List[Dict[str, Any]]:
+        selected = self.follower_degree[self.rows] >= max(min_leaders, min_shared)
+        entries = pd.DataFrame({'follower': self.rows[selected], 'leader': self.cols[selected]})
+        # Only leaders with at least two selected followers can link any
+        leader_sizes = np.bincount(entries['leader'].to_numpy(), minlength=len(self.leaders))
+        entries = entries[leader_sizes[entries['leader'].to_numpy()] >= 2]
+        if entries.empty:
+            return []
+
+        if min_shared == 1:
+            # Followers sharing any leader are linked, so clusters are the connected
+            # components of the follower-leader graph itself (leaders numbered after followers)
+            a = entries['follower'].to_numpy()
+            b = entries['leader'].to_numpy() + len(self.followers)
+            labels = _connected_components(a, b, len(self.followers) + len(self.leaders))
+            members = np.unique(a)
+        else:
+            a, b = self._linked_pairs(entries, min_shared)
+            if not len(a):
+                return []
+            labels = _connected_components(a, b, len(self.followers))
+            members = np.unique(np.concatenate([a, b]))
+
+        cluster_of = np.full(len(self.followers), -1)
+        cluster_of[members] = labels[members]
+        entries = entries.assign(cluster=cluster_of[entries['follower'].to_numpy()])
+
+        # Leaders copied by at least two members of a cluster
+        leader_counts = entries[entries['cluster'] >= 0].groupby(['cluster', 'leader']).size()
+        leader_counts = leader_counts[leader_counts >= 2].sort_values(ascending=False, kind='stable')
+        cluster_leaders = {
+            cluster: [
+                {"leader": self.leaders[leader], "followers": int(count)}
+                for (_, leader), count in counts.items()
+            ]
+            for cluster, counts in leader_counts.groupby(level='cluster')
+        }
+
+        clusters = []
+        for cluster, group in pd.Series(members).groupby(labels[members]):
+            if len(group) < min_size:
+                continue
+            clusters.append({
+                "size": len(group),
+                "followers": [self.followers[i] for i in group],
+                "leaders": cluster_leaders.get(cluster, []),
+            })
+
+        clusters.sort(key=lambda cluster: (-cluster["size"], cluster["followers"][0]))
+        return clusters
+
+
+class FollowerIndex:
+    """
+    Global SQLite inverted index of follower -> (leader, hits, score, tier)
+    over every analyzed leader.
+
+    A leader's rows are replaced whenever its follower scores are saved.
+    Each replacement bumps a version number, and the in-memory
+    CoFollowingMatrix built from the index is only rebuilt when that
+    version changed (in this or any other process).
+    """
+
+    def __init__(self, db_path: str, max_paired_followers: int = MAX_PAIRED_FOLLOWERS,
+                 max_pairs: int = MAX_CLUSTER_PAIRS):
+        self.db_path = db_path
+        self.max_paired_followers = max_paired_followers
+        self.max_pairs = max_pairs
+        self._lock = threading.Lock()
+        self._matrix: Optional[CoFollowingMatrix] = None
+        self._matrix_version = None
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def update_leader(self, leader_addr: str, scores: pd.DataFrame):
+        """Replace a leader's followers with scores (addr, hits, score, tier)"""
+        updated_at = int(time.time())
+        rows = [
+            (addr, leader_addr, int(hits), float(score), tier, updated_at)
+            for addr, hits, score, tier in scores[['addr', 'hits', 'score', 'tier']].itertuples(index=False, name=None)
+        ] if not scores.empty else []
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM follower_index WHERE leader_addr = ?", (leader_addr,))
+                conn.executemany("INSERT INTO follower_index VALUES (?, ?, ?, ?, ?, ?)", rows)
+                conn.execute(
+                    "INSERT INTO meta VALUES ('version', 1) "
+                    "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+                )
+        finally:
+            conn.close()
+
+    def follower_leaders(self, follower_addr: str) -> List[Dict[str, Any]]:
+        """Every indexed leader a follower copies, best score first"""
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(
+                "SELECT leader_addr AS leader, hits, score, tier, updated_at FROM follower_index "
+                "WHERE follower_addr = ? ORDER BY score DESC, leader_addr",
+                (follower_addr,)
+            )]
+        finally:
+            conn.close()
+
+    def matrix(self) -> CoFollowingMatrix:
+        """Co-following matrix of the current index (cached until the index changes)"""
+        conn = self._connect()
+        try:
+            with self._lock:
+                version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+                if self._matrix is None or version != self._matrix_version:
+                    entries = pd.read_sql_query("SELECT follower_addr, leader_addr FROM follower_index", conn)
+                    self._matrix = CoFollowingMatrix(entries['follower_addr'].to_numpy(),
+                                                     entries['leader_addr'].to_numpy(),
+                                                     self.max_paired_followers, self.max_pairs)
+                    self._matrix_version = version
+                return self._matrix
+        finally:
+            conn.close()
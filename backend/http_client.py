@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import AdaptiveRateLimiter, backoff_delay, parse_retry_after
+
+# httpx (with the h2 extra) is optional and only used when HTTP/2 is enabled
+try:
+    import httpx
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTP2_AVAILABLE = False
+
+# Client configuration
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "30"))
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "32"))
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "0").lower() in ("1", "true", "yes")
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "5"))
+
+# Status codes that mean "slow down / try again" rather than "no data"
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+
+class UpstreamThrottledError(requests.exceptions.HTTPError):
+    """Raised when a provider keeps throttling or failing after all retries"""
+
+
+class HttpClient:
+    """
+    Shared HTTP client used by every Helius and Moralis fetch path.
+
+    Keeps connections alive in a per-host pool so that pagination and
+    per-buy requests reuse TCP+TLS sessions instead of handshaking each
+    time. Uses HTTP/2 through httpx when enabled and installed, otherwise
+    a pooled requests.Session.
+
+    Every request is paced by a per-host adaptive token bucket. 429 and 5xx
+    responses and transport errors are retried with Retry-After or jittered
+    exponential backoff, and raise once retries are exhausted so throttling
+    never looks like an empty result.
+    """
+
+    def __init__(self, connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 http2: bool = HTTP2_ENABLED,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 max_retries: int = HTTP_MAX_RETRIES):
+        self.use_http2 = http2 and HTTP2_AVAILABLE
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._connections = defaultdict(int)
+        self._http_versions = defaultdict(lambda: defaultdict(int))
+
+        if self.use_http2:
+            self._client = httpx.Client(
+                http2=True,
+                headers=DEFAULT_HEADERS,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=pool_maxsize,
+                                    max_keepalive_connections=pool_maxsize),
+            )
+        else:
+            self._timeout = (connect_timeout, read_timeout)
+            self._adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize)
+            self._session = requests.Session()
+            self._session.headers.update(DEFAULT_HEADERS)
+            self._session.mount("https://", self._adapter)
+            self._session.mount("http://", self._adapter)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None):
+        """
+        Send a rate-limited GET request, retrying throttled and failed attempts.
+        Transport errors are raised as requests exceptions for both backends.
+        """
+        bucket = self.rate_limiter.bucket(url)
+        attempt = 0
+
+        while True:
+            bucket.acquire()
+            try:
+                response = self._send(url, params, headers)
+            except requests.exceptions.RequestException as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                print(f"Request to {url} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    bucket.on_success()
+                    return response
+
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                bucket.on_throttle(retry_after)
+                if attempt >= self.max_retries:
+                    raise UpstreamThrottledError(
+                        f"{response.status_code} Error for url: {url} after {attempt + 1} attempts",
+                        response=response
+                    )
+                # Retry-After pauses the whole host bucket; otherwise back off locally
+                delay = 0.0 if retry_after is not None else backoff_delay(attempt)
+                print(f"Throttled by {url} ({response.status_code}), retrying after "
+                      f"{retry_after if retry_after is not None else round(delay, 2)}s")
+
+            if delay > 0:
+                time.sleep(delay)
+            attempt += 1
+
+    def _send(self, url: str, params: Optional[Dict[str, Any]],
+              headers: Optional[Dict[str, str]]):
+        """Send a single GET over the pooled connection and record stats"""
+        host = urlparse(url).hostname or url
+
+        if self.use_http2:
+            def trace(event_name: str, info: Dict[str, Any]):
+                if event_name == "connection.connect_tcp.complete":
+                    with self._lock:
+                        self._connections[host] += 1
+
+            try:
+                response = self._client.get(url, params=params, headers=headers,
+                                            extensions={"trace": trace})
+            except httpx.HTTPError as e:
+                raise requests.exceptions.ConnectionError(str(e)) from e
+            http_version = response.http_version
+        else:
+            response = self._session.get(url, params=params, headers=headers,
+                                         timeout=self._timeout)
+            http_version = "HTTP/1.1"
+
+        with self._lock:
+            self._requests[host] += 1
+            self._http_versions[host][http_version] += 1
+
+        return response
+
+    @staticmethod
+    def check_status(response, url: str):
+        """Raise a requests HTTPError for 4xx/5xx responses from either backend"""
+        if response.status_code >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{response.status_code} Error for url: {url}", response=response
+            )
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                 headers: Optional[Dict[str, str]] = None) -> Any:
+        """GET a URL and return the decoded JSON body, raising on HTTP errors"""
+        response = self.get(url, params=params, headers=headers)
+        self.check_status(response, url)
+        return response.json()
+
+    def _opened_connections(self) -> Dict[str, int]:
+        """Number of connections opened per host since the client was created"""
+        if self.use_http2:
+            with self._lock:
+                return dict(self._connections)
+
+        opened = defaultdict(int)
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                opened[pool.host] += pool.num_connections
+        return opened
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host request counts, connection reuse and adapted request rate"""
+        opened = self._opened_connections()
+        rates = self.rate_limiter.stats()
+
+        with self._lock:
+            hosts = set(self._requests) | set(opened)
+            stats = {}
+            for host in sorted(hosts):
+                request_count = self._requests.get(host, 0)
+                connection_count = opened.get(host, 0)
+                reused = max(0, request_count - connection_count)
+                stats[host] = {
+                    "requests": request_count,
+                    "connections_opened": connection_count,
+                    "reused_requests": reused,
+                    "reuse_ratio": round(reused / request_count, 3) if request_count else 0.0,
+                    "http_versions": dict(self._http_versions.get(host, {})),
+                    "rate_limit": rates.get(host, {}),
+                }
+        return stats
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide shared HTTP client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
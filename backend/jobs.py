@@ -0,0 +1,185 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+logger = logging.getLogger("copy_trader_api.jobs")
+
+# Pipeline steps in execution order, as reported in the progress map
+PIPELINE_STEPS = [
+    "fetch_transactions",
+    "filter_transactions",
+    "fetch_swaps",
+    "analyze_copy_trades",
+    "calculate_scores",
+]
+
+# Finished jobs are kept this long so clients can still poll their result
+FINISHED_JOB_TTL_SECONDS = 3600
+
+
+class Job:
+    """State of one background wallet analysis"""
+
+    def __init__(self, wallet_address: str):
+        self.id = uuid.uuid4().hex
+        self.wallet_address = wallet_address
+        self.status = "queued"
+        self.message = f"Queued analysis of wallet {wallet_address}"
+        self.current_step = "queued"
+        self.next_step: Optional[str] = PIPELINE_STEPS[0]
+        self.progress: Dict[str, str] = {step: "pending" for step in PIPELINE_STEPS}
+        self.data: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._events_changed = threading.Condition(self._lock)
+
+    def _publish(self, event: str, data: Dict[str, Any]):
+        """Append an event and wake up streaming readers; caller holds the lock"""
+        self.events.append({"id": len(self.events), "event": event, "data": data})
+        self._events_changed.notify_all()
+
+    def _progress_data(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "current_step": self.current_step,
+            "next_step": self.next_step,
+            "progress": dict(self.progress),
+        }
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """Publish an intermediate event (swap-fetch progress, provisional scores, ...)"""
+        with self._lock:
+            self._publish(event, data)
+
+    def wait_for_events(self, start: int, timeout: float) -> List[Dict[str, Any]]:
+        """
+        Return the events with id >= start, waiting up to timeout seconds
+        for one to arrive. Returns an empty list on timeout or once the job
+        has finished and every event was read.
+        """
+        with self._lock:
+            if start >= len(self.events) and not self.finished:
+                self._events_changed.wait(timeout)
+            return self.events[start:]
+
+    def start_steps(self, *steps: str):
+        """Mark the given steps as running and every earlier step as completed"""
+        with self._lock:
+            first = PIPELINE_STEPS.index(steps[0])
+            last = PIPELINE_STEPS.index(steps[-1])
+            for step in PIPELINE_STEPS[:first]:
+                self.progress[step] = "completed"
+            for step in steps:
+                self.progress[step] = "running"
+            self.status = "running"
+            self.message = f"Running analysis of wallet {self.wallet_address}"
+            self.current_step = steps[0]
+            self.next_step = PIPELINE_STEPS[last + 1] if last + 1 < len(PIPELINE_STEPS) else None
+            self.updated_at = time.time()
+            self._publish("progress", self._progress_data())
+
+    def complete(self, message: str, data: Dict[str, Any]):
+        with self._lock:
+            for step in PIPELINE_STEPS:
+                self.progress[step] = "completed"
+            self.status = "success"
+            self.message = message
+            self.current_step = PIPELINE_STEPS[-1]
+            self.next_step = None
+            self.data = data
+            self.updated_at = time.time()
+            self._publish("progress", self._progress_data())
+            self._publish("completed", {"message": message, **data})
+
+    def fail(self, error: str):
+        with self._lock:
+            for step, state in self.progress.items():
+                if state == "running":
+                    self.progress[step] = "failed"
+            self.status = "failed"
+            self.message = f"Error processing wallet: {error}"
+            self.error = error
+            self.updated_at = time.time()
+            self._publish("progress", self._progress_data())
+            self._publish("failed", {"message": self.message})
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("success", "failed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Consistent copy of the job state in ProgressResponse form"""
+        with self._lock:
+            return {
+                "status": self.status,
+                "message": self.message,
+                "data": {"job_id": self.id, "wallet_address": self.wallet_address, **self.data},
+                "current_step": self.current_step,
+                "next_step": self.next_step,
+                "progress": dict(self.progress),
+            }
+
+
+class JobManager:
+    """
+    Runs wallet analyses on a worker pool and keeps their state for polling.
+
+    Submissions are coalesced per wallet: while an analysis of a wallet is
+    queued or running, submitting the same wallet again returns the running
+    job instead of starting a second one.
+    """
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                            thread_name_prefix="wallet-job")
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, wallet_address: str, run: Callable[[Job], None]) -> Tuple[Job, bool]:
+        """
+        Queue run(job) on the worker pool, or attach to the wallet's in-flight
+        job. run must call job.complete(); any exception it raises marks the
+        job as failed. Returns the job and whether it was newly created.
+        """
+        with self._lock:
+            active = self._active.get(wallet_address)
+            if active is not None and not active.finished:
+                return active, False
+
+            self._expire()
+            job = Job(wallet_address)
+            self._jobs[job.id] = job
+            self._active[wallet_address] = job
+
+        self._executor.submit(self._run, job, run)
+        return job, True
+
+    def _run(self, job: Job, run: Callable[[Job], None]):
+        try:
+            run(job)
+        except Exception as e:
+            logger.error(f"Job {job.id} for wallet {job.wallet_address} failed: {e}", exc_info=True)
+            job.fail(str(e))
+        finally:
+            with self._lock:
+                if self._active.get(job.wallet_address) is job:
+                    del self._active[job.wallet_address]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _expire(self):
+        """Forget finished jobs older than FINISHED_JOB_TTL_SECONDS"""
+        cutoff = time.time() - FINISHED_JOB_TTL_SECONDS
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.updated_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
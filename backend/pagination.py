@@ -0,0 +1,107 @@
+import base64
+import heapq
+import json
+from typing import Dict, Any, List, Optional
+
+# Sortable follower-score fields and their default direction
+SORT_FIELDS = {
+    "score": "desc",
+    "hits": "desc",
+    "avg_delay": "asc",
+}
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque, URL-safe cursor for the given keyset values"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_count(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def decode_position_cursor(cursor: str) -> int:
+    """Position held by a cursor of encode_cursor([position]); raises ValueError otherwise"""
+    values = decode_cursor(cursor)
+    if len(values) != 1 or not _is_count(values[0]):
+        raise ValueError("Invalid cursor")
+    return values[0]
+
+
+def page_follower_scores(scores: List[Dict[str, Any]], sort_by: str = "score",
+                         order: Optional[str] = None, tier: Optional[str] = None,
+                         limit: Optional[int] = None, cursor: Optional[str] = None,
+                         top_k: Optional[int] = None) -> Dict[str, Any]:
+    """
+    One page of follower scores, optionally restricted to a tier and to the
+    top_k rows overall. Rows are ordered by sort_by (ties broken by address)
+    and paged by keyset: the cursor holds the sort key of the last returned
+    row. Pages are chosen with a partial selection of limit rows rather
+    than by sorting every follower.
+    Returns {"follower_scores", "total_followers", "next_cursor"}.
+    """
+    if sort_by not in SORT_FIELDS:
+        raise ValueError(f"Cannot sort by {sort_by}; expected one of {', '.join(SORT_FIELDS)}")
+    order = order or SORT_FIELDS[sort_by]
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be asc or desc")
+    descending = order == "desc"
+
+    def sort_key(row):
+        return (-row[sort_by] if descending else row[sort_by], row['addr'])
+
+    rows = scores if tier is None else [row for row in scores if row['tier'] == tier]
+    total = len(rows) if top_k is None else min(len(rows), top_k)
+
+    returned = 0
+    candidates = rows
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 5 or values[:2] != [sort_by, order]:
+            raise ValueError("Cursor does not match the requested sort order")
+        # Every sort field is numeric; the tie-breaker is an address
+        if not _is_number(values[2]) or not isinstance(values[3], str) or not _is_count(values[4]):
+            raise ValueError("Invalid cursor")
+        after = (values[2], values[3])
+        returned = values[4]
+        candidates = [row for row in rows if sort_key(row) > after]
+
+    size = limit
+    if top_k is not None:
+        remaining = max(top_k - returned, 0)
+        size = remaining if size is None else min(size, remaining)
+
+    if size is None:
+        page = sorted(candidates, key=sort_key)
+        has_more = False
+    else:
+        # One extra row tells whether another page follows
+        page = heapq.nsmallest(size + 1, candidates, key=sort_key)
+        has_more = len(page) > size
+        page = page[:size]
+
+    next_cursor = None
+    if has_more and page and returned + len(page) < total:
+        last_key = sort_key(page[-1])
+        next_cursor = encode_cursor([sort_by, order, last_key[0], last_key[1], returned + len(page)])
+
+    return {
+        "follower_scores": page,
+        "total_followers": total,
+        "next_cursor": next_cursor,
+    }
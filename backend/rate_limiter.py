@@ -0,0 +1,124 @@
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Default request rate (requests per second) allowed per upstream host
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+
+# Maximum quota-allowed request rates per provider host
+PROVIDER_RATE_LIMITS = {
+    "api.helius.xyz": float(os.environ.get("HELIUS_RATE_LIMIT", "10")),
+    "solana-gateway.moralis.io": float(os.environ.get("MORALIS_RATE_LIMIT", "10")),
+}
+
+# Adaptive behaviour: multiplicative decrease on throttling, additive recovery on success
+THROTTLE_DECREASE_FACTOR = 0.5
+RECOVERY_STEP = 0.1  # fraction of the max rate regained per successful request
+MIN_RATE_FRACTION = 0.05
+
+# Retry backoff (seconds)
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Full-jitter exponential backoff delay for the given retry attempt (0-based)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds; HTTP dates are ignored"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket whose refill rate adapts to upstream responses.
+
+    The rate starts at the quota maximum, is cut multiplicatively whenever
+    the provider throttles us and recovers additively on success, so the
+    bucket settles just under the throughput the provider really allows.
+    """
+
+    def __init__(self, max_rate: float, capacity: Optional[float] = None):
+        self.max_rate = max_rate
+        self.min_rate = max_rate * MIN_RATE_FRACTION
+        self.rate = max_rate
+        self.capacity = capacity if capacity is not None else max(1.0, max_rate)
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a token is available, honouring any Retry-After pause"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+    def on_success(self):
+        """Recover part of the rate after a successful request"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Cut the rate after a 429/5xx and pause the bucket for Retry-After seconds"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * THROTTLE_DECREASE_FACTOR)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+class AdaptiveRateLimiter:
+    """Thread-safe collection of per-host adaptive token buckets"""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None,
+                 default_rate: float = DEFAULT_REQUESTS_PER_SECOND):
+        self.rates = dict(rates if rates is not None else PROVIDER_RATE_LIMITS)
+        self.default_rate = default_rate
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        """Return the token bucket for a host (or the host of a URL)"""
+        host = urlparse(url_or_host).hostname or url_or_host
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rates.get(host, self.default_rate))
+            return self._buckets[host]
+
+    def acquire(self, url_or_host: str):
+        """Block until a request to the given host (or URL) is allowed"""
+        self.bucket(url_or_host).acquire()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Current adapted rate of every host seen so far"""
+        with self._lock:
+            return {
+                host: {"rate": round(bucket.rate, 3), "max_rate": bucket.max_rate}
+                for host, bucket in self._buckets.items()
+            }
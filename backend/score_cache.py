@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import pandas as pd
+
+from snapshots import latest_snapshot
+
+
+class ScoreSnapshotCache:
+    """
+    In-memory LRU of the latest persisted follower-score snapshot per wallet.
+
+    An entry is trusted for ttl_seconds; after that the wallet directory is
+    checked again and the snapshot is only re-read from disk if a newer file
+    (or a rewritten one) exists. Each entry carries an ETag derived from the
+    snapshot file name and modification time.
+    """
+
+    def __init__(self, data_dir: str, ttl_seconds: float = 60, max_entries: int = 128):
+        self.data_dir = data_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load_snapshot(path: str, mtime_ns: int) -> Dict[str, Any]:
+        metrics = pd.read_parquet(path)
+        return {
+            "path": path,
+            "mtime_ns": mtime_ns,
+            "etag": f'"{os.path.basename(path)[:-8]}-{mtime_ns}"',
+            "computed_at": mtime_ns / 1e9,
+            "total_followers": len(metrics),
+            "tier_distribution": metrics['tier'].value_counts().to_dict() if not metrics.empty else {},
+            "follower_scores": metrics.to_dict('records'),
+        }
+
+    def get(self, wallet_address: str) -> Optional[Dict[str, Any]]:
+        """Latest snapshot of a wallet, or None if it has never been scored"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(wallet_address)
+            if entry is not None and now - entry["checked_at"] < self.ttl_seconds:
+                self._entries.move_to_end(wallet_address)
+                self.hits += 1
+                return entry["snapshot"]
+
+        path = latest_snapshot(os.path.join(self.data_dir, wallet_address), "follower_scores")
+        if path is None:
+            self.invalidate(wallet_address)
+            return None
+
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            # Removed between glob and stat; try again on the next request
+            return None
+
+        if entry is not None and entry["snapshot"]["path"] == path and entry["snapshot"]["mtime_ns"] == mtime_ns:
+            snapshot = entry["snapshot"]
+        else:
+            snapshot = self._load_snapshot(path, mtime_ns)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[wallet_address] = {"snapshot": snapshot, "checked_at": now}
+            self._entries.move_to_end(wallet_address)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return snapshot
+
+    def invalidate(self, wallet_address: str):
+        """Forget a wallet's entry, e.g. after a new snapshot was written"""
+        with self._lock:
+            self._entries.pop(wallet_address, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,207 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, field_validator, model_validator
+
+METRICS_COLUMNS = ['addr', 'hits', 'breadth', 'avg_delay', 'med_delay']
+SCORES_COLUMNS = METRICS_COLUMNS + ['freq_norm', 'breadth_norm', 'speed_norm', 'score', 'tier']
+# Longest window (slots) that can be scored
+MAX_WINDOW = 1000
+
+
+class ScoringParams(BaseModel):
+    """Parameters of the follower copy score"""
+    window: int = 10            # Maximum delay (slots) counted as a copy trade
+    min_hits: int = 3           # Followers with fewer copy trades are not scored
+    fast_delay: float = 4       # Delays up to this many slots get the full speed score
+    freq_weight: float = 0.5
+    speed_weight: float = 0.3
+    breadth_weight: float = 0.2
+    tier_boundaries: Dict[str, float] = {
+        'Gold': 0.7,
+        'Silver': 0.5,
+        'Bronze': 0.3
+    }
+
+    @field_validator('tier_boundaries')
+    @classmethod
+    def check_tier_boundaries(cls, tier_boundaries: Dict[str, float]) -> Dict[str, float]:
+        if not tier_boundaries:
+            raise ValueError("tier_boundaries must name at least one tier")
+        if not all(np.isfinite(boundary) for boundary in tier_boundaries.values()):
+            raise ValueError("tier boundaries must be finite")
+        return tier_boundaries
+
+    @model_validator(mode='after')
+    def check_window(self):
+        if self.window < 0 or self.fast_delay >= self.window or self.window > MAX_WINDOW:
+            raise ValueError(f"window must be larger than fast_delay and at most {MAX_WINDOW}")
+        return self
+
+
+def empty_scores() -> pd.DataFrame:
+    """A scores table without followers"""
+    return pd.DataFrame({
+        'addr': pd.Series(dtype=object),
+        'hits': pd.Series(dtype='int64'),
+        'breadth': pd.Series(dtype='int64'),
+        **{column: pd.Series(dtype=float) for column in SCORES_COLUMNS[3:-1]},
+        'tier': pd.Series(dtype=object),
+    })
+
+
+def median_delays(cumulative_hits: np.ndarray, hits: np.ndarray) -> np.ndarray:
+    """
+    Median delay of every row of a follower x delay cumulative histogram,
+    where hits is each row's total count
+    """
+    # The k-th smallest delay (0-based) is the first delay whose cumulative count exceeds k
+    lower = (cumulative_hits <= ((hits - 1) // 2)[:, None]).sum(axis=1)
+    upper = (cumulative_hits <= (hits // 2)[:, None]).sum(axis=1)
+    return (lower + upper) / 2
+
+
+def clean_copy_trades(df: pd.DataFrame, params: ScoringParams) -> pd.DataFrame:
+    """Keep copy trades with 0 <= delay_slots <= window (negative delays are frontrunning/MEV)"""
+    if df.empty:
+        return df
+    return df[(df['delay_slots'] >= 0) & (df['delay_slots'] <= params.window)]
+
+
+def follower_metrics(df: pd.DataFrame, params: ScoringParams) -> pd.DataFrame:
+    """hits, breadth and average/median delay of every follower with at least min_hits"""
+    if df.empty:
+        return pd.DataFrame(columns=METRICS_COLUMNS)
+
+    metrics = df.groupby('follower_addr', observed=True).agg({
+        'lead_index': 'count',  # hits
+        'token': 'nunique',     # breadth
+        'delay_slots': ['mean', 'median']  # avg_delay and med_delay
+    }).reset_index()
+    metrics.columns = METRICS_COLUMNS
+
+    return metrics[metrics['hits'] >= params.min_hits]
+
+
+def normalize_metrics(metrics: pd.DataFrame, total_lead_buys: int, params: ScoringParams) -> pd.DataFrame:
+    """Add freq_norm, breadth_norm and speed_norm to follower metrics"""
+    if metrics.empty:
+        return metrics
+
+    hits = metrics['hits'].to_numpy()
+    metrics['freq_norm'] = hits / total_lead_buys
+    metrics['breadth_norm'] = metrics['breadth'].to_numpy() / hits
+    # 1.0 up to fast_delay, then a linear fall-off to 0.0 at window
+    metrics['speed_norm'] = np.clip(
+        1 - (metrics['avg_delay'].to_numpy(dtype=float) - params.fast_delay) / (params.window - params.fast_delay),
+        0.0, 1.0
+    )
+
+    return metrics
+
+
+def calculate_scores(metrics: pd.DataFrame, params: ScoringParams) -> pd.DataFrame:
+    """Add the weighted copy score and the tier to normalized follower metrics"""
+    if metrics.empty:
+        return metrics
+
+    score = (
+        params.freq_weight * metrics['freq_norm'].to_numpy() +
+        params.speed_weight * metrics['speed_norm'].to_numpy() +
+        params.breadth_weight * metrics['breadth_norm'].to_numpy()
+    )
+    metrics['score'] = score
+
+    tiers = sorted(params.tier_boundaries.items(), key=lambda item: item[1], reverse=True)
+    if not tiers:
+        metrics['tier'] = 'Unranked'
+        return metrics
+    metrics['tier'] = np.select(
+        [score >= boundary for _, boundary in tiers],
+        [tier for tier, _ in tiers],
+        default='Unranked'
+    )
+
+    return metrics
+
+
+def score_metrics(metrics: pd.DataFrame, total_lead_buys: int, params: ScoringParams) -> pd.DataFrame:
+    """Normalize and score follower metrics"""
+    if metrics.empty:
+        return empty_scores()
+    return calculate_scores(normalize_metrics(metrics, total_lead_buys, params), params)
+
+
+def score_copy_trades(df: pd.DataFrame, params: ScoringParams) -> pd.DataFrame:
+    """Score every follower of a copy trades table"""
+    cleaned_df = clean_copy_trades(df, params)
+    if cleaned_df.empty:
+        return empty_scores()
+
+    metrics = follower_metrics(cleaned_df, params)
+    return score_metrics(metrics, cleaned_df['lead_index'].nunique(), params)
+
+
+def score_grid(df: pd.DataFrame, grid: List[ScoringParams]) -> List[pd.DataFrame]:
+    """
+    Score one copy trades table under many parameter sets, returning one
+    table per set exactly as score_copy_trades would.
+
+    The table is reduced once to a follower x delay histogram (delays
+    0..max window), the smallest delay of every (follower, token) pair and
+    of every lead buy. Each window is then a prefix of the histogram: hits,
+    mean and exact median delay come from cumulative counts, breadth from
+    the tokens first copied within the window and the number of lead buys
+    from the leads copied within it. The remaining parameters only
+    re-weight these metrics.
+    """
+    if not grid:
+        return []
+
+    max_window = max(params.window for params in grid)
+    trades = df[(df['delay_slots'] >= 0) & (df['delay_slots'] <= max_window)]
+    if trades.empty:
+        return [empty_scores() for _ in grid]
+
+    # Windows beyond the largest observed delay see the same trades as that delay
+    max_window = int(trades['delay_slots'].max())
+
+    follower_codes, followers = pd.factorize(trades['follower_addr'], sort=True)
+    delays = trades['delay_slots'].to_numpy(dtype=np.int64)
+
+    counts = np.zeros((len(followers), max_window + 1), dtype=np.int64)
+    np.add.at(counts, (follower_codes, delays), 1)
+    cumulative_hits = counts.cumsum(axis=1)
+    cumulative_delay = (counts * np.arange(max_window + 1)).cumsum(axis=1)
+
+    first_token_delay = (pd.DataFrame({'follower': follower_codes, 'token': trades['token'].to_numpy(), 'delay': delays})
+                         .groupby(['follower', 'token'], observed=True)['delay'].min())
+    token_counts = np.zeros((len(followers), max_window + 1), dtype=np.int64)
+    np.add.at(token_counts, (first_token_delay.index.get_level_values('follower').to_numpy(),
+                             first_token_delay.to_numpy()), 1)
+    cumulative_breadth = token_counts.cumsum(axis=1)
+
+    first_lead_delay = trades.groupby('lead_index', observed=True)['delay_slots'].min().to_numpy()
+    cumulative_leads = np.bincount(first_lead_delay, minlength=max_window + 1).cumsum()
+
+    results = []
+    for params in grid:
+        w = min(params.window, max_window)
+        hits = cumulative_hits[:, w]
+        selected = hits >= max(params.min_hits, 1)
+        hits = hits[selected]
+        if not len(hits):
+            results.append(empty_scores())
+            continue
+
+        metrics = pd.DataFrame({
+            'addr': followers[selected],
+            'hits': hits,
+            'breadth': cumulative_breadth[selected, w],
+            'avg_delay': cumulative_delay[selected, w] / hits,
+            'med_delay': median_delays(cumulative_hits[selected, :w + 1], hits),
+        })
+        results.append(score_metrics(metrics, int(cumulative_leads[w]), params))
+
+    return results
@@ -0,0 +1,53 @@
+import json
+from typing import Any, Union
+
+# orjson is several times faster than the standard library for both
+# directions; the stdlib json module is used when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+import numpy as np
+
+
+def _default(obj: Any) -> Any:
+    """Encode values neither encoder supports natively (numpy scalars, ...)"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON encoding of obj as UTF-8 bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+def dumps_str(obj: Any) -> str:
+    """Compact JSON encoding of obj as a string"""
+    return dumps(obj).decode()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_file(obj: Any, path: str):
+    """Write obj to path as compact JSON"""
+    with open(path, 'wb') as f:
+        f.write(dumps(obj))
+
+
+def load_file(path: str) -> Any:
+    """Read a JSON file (compact or pretty-printed)"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
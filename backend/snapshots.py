@@ -0,0 +1,83 @@
+import glob
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Formats a snapshot can be exported to; Parquet is always the canonical copy
+EXPORT_FORMATS = ("parquet", "csv", "json")
+
+
+def snapshot_paths(directory: str, prefix: str) -> List[str]:
+    """Parquet snapshots named {prefix}_{timestamp}.parquet, oldest first"""
+    # Timestamped names sort chronologically
+    return sorted(glob.glob(os.path.join(directory, f"{prefix}_*.parquet")))
+
+
+def latest_snapshot(directory: str, prefix: str) -> Optional[str]:
+    paths = snapshot_paths(directory, prefix)
+    return paths[-1] if paths else None
+
+
+def export_snapshot(parquet_path: str, fmt: str) -> str:
+    """
+    Path of the snapshot in the given format, converting the Parquet file
+    the first time that format is requested (or after it was rewritten)
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported format {fmt}; expected one of {', '.join(EXPORT_FORMATS)}")
+    if fmt == "parquet":
+        return parquet_path
+
+    export_path = f"{parquet_path[:-len('.parquet')]}.{fmt}"
+    if os.path.exists(export_path) and os.path.getmtime(export_path) >= os.path.getmtime(parquet_path):
+        return export_path
+
+    df = pd.read_parquet(parquet_path)
+    tmp_path = export_path + ".tmp"
+    if fmt == "csv":
+        df.to_csv(tmp_path, index=False)
+    else:
+        df.to_json(tmp_path, orient='records')
+    os.replace(tmp_path, export_path)
+    return export_path
+
+
+def prune_snapshots(directory: str, prefix: str, keep: int) -> int:
+    """
+    Delete all but the newest keep snapshots (every format); returns how
+    many were removed. The newest snapshot is always kept.
+    """
+    paths = snapshot_paths(directory, prefix)
+    expired = paths[:-max(keep, 1)]
+
+    for parquet_path in expired:
+        base = parquet_path[:-len('.parquet')]
+        for fmt in EXPORT_FORMATS:
+            try:
+                os.remove(f"{base}.{fmt}")
+            except FileNotFoundError:
+                pass
+
+    return len(expired)
+
+
+def write_snapshot(df: pd.DataFrame, directory: str, prefix: str, timestamp: str,
+                   formats: List[str], keep: int) -> Dict[str, str]:
+    """
+    Write df as the Parquet snapshot {prefix}_{timestamp}, plus eager copies
+    in the other requested formats, then apply the retention policy.
+    Returns the written paths keyed by format.
+    """
+    parquet_path = os.path.join(directory, f"{prefix}_{timestamp}.parquet")
+    tmp_path = parquet_path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+
+    paths = {"parquet": parquet_path}
+    for fmt in formats:
+        if fmt != "parquet":
+            paths[fmt] = export_snapshot(parquet_path, fmt)
+
+    prune_snapshots(directory, prefix, keep)
+    return paths
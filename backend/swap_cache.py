@@ -0,0 +1,253 @@
+import glob
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Callable, Tuple
+
+from serialization import loads
+from swap_records import RawSwap, SwapRecord
+
+# Default cache budget on disk before least-recently-used mints are evicted
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS swaps (
+    mint TEXT NOT NULL,
+    swap_key TEXT NOT NULL,
+    block_timestamp INTEGER,
+    block_number INTEGER,
+    fetched_from INTEGER NOT NULL,
+    fetched_to INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (mint, swap_key)
+);
+CREATE INDEX IF NOT EXISTS swaps_time ON swaps (mint, block_timestamp);
+CREATE INDEX IF NOT EXISTS swaps_untimed ON swaps (mint, fetched_to) WHERE block_timestamp IS NULL;
+CREATE TABLE IF NOT EXISTS intervals (
+    mint TEXT NOT NULL,
+    from_date INTEGER NOT NULL,
+    to_date INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS intervals_range ON intervals (mint, from_date);
+CREATE TABLE IF NOT EXISTS mints (
+    mint TEXT PRIMARY KEY,
+    bytes INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+"""
+
+# Swaps of a window; swaps without a block timestamp belong to every window
+# overlapping the query range they were fetched with
+SELECT_WINDOW = """
+SELECT data, block_number FROM swaps
+WHERE mint = ? AND block_timestamp BETWEEN ? AND ?
+UNION ALL
+SELECT data, block_number FROM swaps
+WHERE mint = ? AND block_timestamp IS NULL AND fetched_from <= ? AND fetched_to >= ?
+ORDER BY block_number DESC
+"""
+
+Interval = Tuple[int, int]
+FetchFn = Callable[[str, int, int], Tuple[List[RawSwap], int]]
+
+
+def merge_intervals(intervals: List[Interval]) -> List[Interval]:
+    """Merge overlapping or adjacent inclusive [from, to] second intervals"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_intervals(from_date: int, to_date: int, covered: List[Interval]) -> List[Interval]:
+    """Sub-ranges of [from_date, to_date] not covered by the (merged) intervals"""
+    missing = []
+    cursor = from_date
+    for start, end in covered:
+        if end < cursor:
+            continue
+        if start > to_date:
+            break
+        if start > cursor:
+            missing.append((cursor, start - 1))
+        cursor = max(cursor, end + 1)
+    if cursor <= to_date:
+        missing.append((cursor, to_date))
+    return missing
+
+
+def swap_key(record: SwapRecord) -> str:
+    """Identity of a swap used for de-duplication"""
+    return f"{record.transaction_hash}|{record.wallet_address}"
+
+
+class SwapCache:
+    """
+    Global, cross-wallet cache of Moralis swaps keyed by token mint.
+
+    Swaps and the time ranges that have been fully fetched per mint are
+    kept in one SQLite database, indexed by mint and time, so a lookup only
+    reads the intervals and swaps of the requested window. Window requests
+    covered by the intervals are answered locally; only the missing
+    sub-ranges go to Moralis. Fetching happens outside any lock or
+    transaction and the results are committed in one short transaction, so
+    several threads and server processes can share the cache. Only settled
+    ranges are recorded as covered, since recent ones may still change.
+    Mints are evicted least-recently-used once the stored swaps exceed
+    max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 settle_seconds: int = 300):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.settle_seconds = settle_seconds
+        self.hits = 0
+        self.misses = 0
+        self.db_path = os.path.join(cache_dir, "swaps.sqlite")
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        # Per-mint JSON files of older versions are not migrated; it is only a cache
+        for path in glob.glob(os.path.join(cache_dir, "*.json")):
+            os.remove(path)
+
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    @staticmethod
+    def _covered(conn: sqlite3.Connection, mint: str, from_date: int, to_date: int) -> List[Interval]:
+        """Stored intervals of a mint overlapping or touching [from_date, to_date], in order"""
+        # Stored intervals are merged, so only the last one starting before
+        # from_date can reach into the range
+        rows = conn.execute(
+            "SELECT * FROM (SELECT from_date, to_date FROM intervals "
+            "WHERE mint = ? AND from_date < ? ORDER BY from_date DESC LIMIT 1) "
+            "UNION ALL "
+            "SELECT from_date, to_date FROM intervals WHERE mint = ? AND from_date BETWEEN ? AND ?",
+            (mint, from_date, mint, from_date, to_date + 1)
+        ).fetchall()
+        return sorted(tuple(row) for row in rows if row[1] >= from_date - 1)
+
+    @staticmethod
+    def _select(conn: sqlite3.Connection, mint: str, from_date: int, to_date: int) -> List[RawSwap]:
+        """Cached swaps of a mint in [from_date, to_date], in the DESC order of Moralis responses"""
+        return [(SwapRecord.from_moralis(loads(row[0])), row[0]) for row in conn.execute(
+            SELECT_WINDOW, (mint, from_date, to_date, mint, to_date, from_date)
+        )]
+
+    def get_window(self, mint: str, from_date: int, to_date: int,
+                   fetch: FetchFn) -> Tuple[List[RawSwap], int]:
+        """
+        Return all swaps of a mint in [from_date, to_date] as (record, JSON)
+        pairs, fetching only the sub-ranges not already cached.
+        fetch(mint, from, to) must return (swaps, pages) in the same form.
+        Returns the swaps and the number of pages fetched.
+        """
+        conn = self._connect()
+        try:
+            missing = missing_intervals(from_date, to_date, self._covered(conn, mint, from_date, to_date))
+
+            if not missing:
+                with self._lock:
+                    self.hits += 1
+                conn.execute("UPDATE mints SET last_access = ? WHERE mint = ?", (time.time(), mint))
+                return self._select(conn, mint, from_date, to_date), 0
+
+            with self._lock:
+                self.misses += 1
+            pages = 0
+            fetched: List[RawSwap] = []
+            pieces = []
+            settled_before = time.time() - self.settle_seconds
+
+            for start, end in missing:
+                swaps, piece_pages = fetch(mint, start, end)
+                pages += piece_pages
+                fetched.extend(swaps)
+                pieces.append((start, end, swaps))
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._store(conn, mint, pieces, settled_before)
+                # Nothing was cached: return the query result exactly as fetched
+                result = fetched if missing == [(from_date, to_date)] else self._select(conn, mint, from_date, to_date)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return result, pages
+        finally:
+            conn.close()
+
+    def _store(self, conn: sqlite3.Connection, mint: str,
+               pieces: List[Tuple[int, int, List[RawSwap]]], settled_before: float):
+        """Insert fetched pieces, record the settled ones as covered and apply the budget"""
+        added_bytes = 0
+        for start, end, swaps in pieces:
+            for record, data in swaps:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO swaps VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (mint, swap_key(record), record.block_timestamp, record.block_number, start, end, data)
+                )
+                if cursor.rowcount:
+                    added_bytes += len(data)
+
+            if end <= settled_before:
+                # Merge with the stored intervals this one overlaps or touches
+                covered = self._covered(conn, mint, start, end)
+                merged = merge_intervals(covered + [(start, end)])
+                conn.executemany(
+                    "DELETE FROM intervals WHERE mint = ? AND from_date = ? AND to_date = ?",
+                    [(mint, covered_start, covered_end) for covered_start, covered_end in covered]
+                )
+                conn.executemany("INSERT INTO intervals VALUES (?, ?, ?)",
+                                 [(mint, merged_start, merged_end) for merged_start, merged_end in merged])
+
+        conn.execute(
+            "INSERT INTO mints VALUES (?, ?, ?) "
+            "ON CONFLICT(mint) DO UPDATE SET bytes = bytes + excluded.bytes, last_access = excluded.last_access",
+            (mint, added_bytes, time.time())
+        )
+        self._evict(conn, keep=mint)
+
+    def _evict(self, conn: sqlite3.Connection, keep: str):
+        """Drop least-recently-used mints (other than keep) until the cache fits in max_bytes"""
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM mints").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for mint, size in conn.execute(
+            "SELECT mint, bytes FROM mints WHERE mint != ? ORDER BY last_access", (keep,)
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            for table in ("swaps", "intervals", "mints"):
+                conn.execute(f"DELETE FROM {table} WHERE mint = ?", (mint,))
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit/miss counters"""
+        conn = self._connect()
+        try:
+            mints, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM mints").fetchone()
+        finally:
+            conn.close()
+        with self._lock:
+            return {
+                "mints": mints,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,74 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
+
+from serialization import load_file
+from swap_records import SwapRecord, parse_swaps
+
+# Default budget, measured in bytes of the cached files on disk
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class SwapFileCache:
+    """
+    Process-wide LRU of parsed token_swaps window files, held as SwapRecords.
+
+    Entries are keyed by path and validated against the file's modification
+    time, so a rewritten window is re-read rather than served stale. Windows
+    written by this process are added on write, so the copy-trade analysis
+    right after a fetch does not parse them again. The cached swap lists are
+    shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._entries: "OrderedDict[str, Tuple[int, int, List[SwapRecord]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> List[SwapRecord]:
+        """Swaps of a window file, parsed at most once per version of the file"""
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stat.st_mtime_ns:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        swaps = parse_swaps(load_file(path).get('result') or [])
+        self._store(path, stat, swaps)
+        return swaps
+
+    def put(self, path: str, swaps: List[SwapRecord]):
+        """Record the swaps just written to path"""
+        self._store(path, os.stat(path), swaps)
+
+    def _store(self, path: str, stat: os.stat_result, swaps: List[SwapRecord]):
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            # Files larger than the whole budget are not worth evicting everything for
+            if stat.st_size > self.max_bytes:
+                return
+
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, swaps)
+            self._bytes += stat.st_size
+            while self._bytes > self.max_bytes:
+                _, (_, size, _) = self._entries.popitem(last=False)
+                self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "files": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,84 @@
+import sys
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from serialization import dumps
+from swap_windows import parse_block_timestamp
+
+
+def _intern(value: Any) -> Any:
+    # Wallets and token metadata repeat across the swaps of a window; share one copy
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class SwapRecord:
+    """
+    Compact record of a Moralis swap holding only the fields the analysis
+    and the copy-transaction drill-down use.
+
+    Stored windows keep the full Moralis response; in memory a fetched swap
+    is only held as its record and its JSON encoding (see encode_swaps). The block timestamp is parsed once to epoch
+    seconds (None if missing or unusable) and repeated strings are interned.
+    """
+
+    __slots__ = (
+        'transaction_hash', 'transaction_type', 'wallet_address', 'block_number',
+        'block_timestamp', 'has_bought', 'bought_address', 'bought_name',
+        'bought_symbol', 'bought_logo', 'bought_amount', 'bought_usd_amount',
+    )
+
+    def __init__(self, transaction_hash: Optional[str], transaction_type: Optional[str],
+                 wallet_address: Optional[str], block_number: Optional[int],
+                 block_timestamp: Optional[int], has_bought: bool = False,
+                 bought_address: Optional[str] = None, bought_name: Optional[str] = None,
+                 bought_symbol: Optional[str] = None, bought_logo: Optional[str] = None,
+                 bought_amount: Optional[str] = None, bought_usd_amount: Optional[float] = None):
+        self.transaction_hash = transaction_hash
+        self.transaction_type = transaction_type
+        self.wallet_address = wallet_address
+        self.block_number = block_number
+        self.block_timestamp = block_timestamp
+        self.has_bought = has_bought
+        self.bought_address = bought_address
+        self.bought_name = bought_name
+        self.bought_symbol = bought_symbol
+        self.bought_logo = bought_logo
+        self.bought_amount = bought_amount
+        self.bought_usd_amount = bought_usd_amount
+
+    @classmethod
+    def from_moralis(cls, swap: Dict[str, Any]) -> "SwapRecord":
+        """Record of a swap as returned by Moralis"""
+        bought = swap.get('bought')
+        has_bought = isinstance(bought, dict)
+        bought = bought if has_bought else {}
+        return cls(
+            swap.get('transactionHash'),
+            _intern(swap.get('transactionType')),
+            _intern(swap.get('walletAddress')),
+            swap.get('blockNumber'),
+            parse_block_timestamp(swap.get('blockTimestamp')),
+            has_bought,
+            _intern(bought.get('address')),
+            _intern(bought.get('name')),
+            _intern(bought.get('symbol')),
+            _intern(bought.get('logo')),
+            bought.get('amount'),
+            bought.get('usdAmount'),
+        )
+
+    def __repr__(self) -> str:
+        return f"SwapRecord({self.transaction_hash!r}, {self.wallet_address!r}, block={self.block_number})"
+
+
+def parse_swaps(swaps: Iterable[Dict[str, Any]]) -> List[SwapRecord]:
+    """Records of a list of Moralis swaps"""
+    return [SwapRecord.from_moralis(swap) for swap in swaps]
+
+
+# A fetched swap: its record and its Moralis JSON encoding, written to disk as is
+RawSwap = Tuple[SwapRecord, bytes]
+
+
+def encode_swaps(swaps: Iterable[Dict[str, Any]]) -> List[RawSwap]:
+    """Records of a list of Moralis swaps paired with each swap's JSON encoding"""
+    return [(SwapRecord.from_moralis(swap), dumps(swap)) for swap in swaps]
@@ -0,0 +1,81 @@
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional
+
+# Longest merged window (seconds) sent to Moralis as a single paginated query
+MAX_MERGED_WINDOW_SECONDS = 60
+
+
+def parse_block_timestamp(value: Any) -> Optional[int]:
+    """Convert a Moralis blockTimestamp (ISO 8601 or epoch) to epoch seconds"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+def plan_swap_windows(buys: List[Dict[str, Any]], window_seconds: int,
+                      max_span: int = MAX_MERGED_WINDOW_SECONDS) -> List[Dict[str, Any]]:
+    """
+    Group lead buys into Moralis queries.
+
+    Each buy needs the swaps of its mint in [timestamp, timestamp + window_seconds].
+    Overlapping or adjacent windows of the same mint are merged into a single
+    query as long as the merged window stays within max_span seconds.
+    Returns plans of the form {"mint", "from_date", "to_date", "buys"}.
+    """
+    by_mint: Dict[str, List[Dict[str, Any]]] = {}
+    for buy in buys:
+        by_mint.setdefault(buy['mint'], []).append(buy)
+
+    plans = []
+    for mint, mint_buys in by_mint.items():
+        mint_buys.sort(key=lambda buy: buy['timestamp'])
+
+        current = None
+        for buy in mint_buys:
+            from_date = buy['timestamp']
+            to_date = from_date + window_seconds
+
+            # Windows are whole seconds, so touching windows can share a query too
+            if (current is not None and from_date <= current['to_date'] + 1
+                    and to_date - current['from_date'] <= max_span):
+                current['to_date'] = max(current['to_date'], to_date)
+                current['buys'].append(buy)
+                continue
+
+            current = {"mint": mint, "from_date": from_date, "to_date": to_date, "buys": [buy]}
+            plans.append(current)
+
+    return plans
+
+
+def moralis_swap_time(swap: Dict[str, Any]) -> Optional[int]:
+    """Block time (epoch seconds) of a Moralis swap"""
+    return parse_block_timestamp(swap.get('blockTimestamp'))
+
+
+def split_swaps_by_window(swaps: List[Any], buys: List[Dict[str, Any]], window_seconds: int,
+                          swap_time: Callable[[Any], Optional[int]] = moralis_swap_time) -> Dict[str, List[Any]]:
+    """
+    Split the swaps of a merged query back into each lead buy's own window,
+    keyed by lead signature. A single-buy plan keeps every swap, exactly as
+    an unmerged query would; swaps without a usable block time (swap_time
+    returns None) are kept in every window of the plan rather than being
+    dropped.
+    """
+    if len(buys) == 1:
+        return {buys[0]['signature']: list(swaps)}
+
+    windows = {buy['signature']: [] for buy in buys}
+    for swap in swaps:
+        block_time = swap_time(swap)
+        for buy in buys:
+            from_date = buy['timestamp']
+            if block_time is None or from_date <= block_time <= from_date + window_seconds:
+                windows[buy['signature']].append(swap)
+
+    return windows
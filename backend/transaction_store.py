@@ -0,0 +1,190 @@
+import glob
+import os
+import threading
+from typing import Dict, Any, List, Iterator, Optional, Set
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from file_lock import FileLock
+from serialization import dumps_str, load_file, loads
+
+# Merge segments into one once a wallet has more than this many
+MAX_SEGMENTS = 32
+
+SEGMENT_SCHEMA = pa.schema([
+    ("signature", pa.string()),
+    ("feePayer", pa.string()),
+    ("slot", pa.int64()),
+    ("timestamp", pa.int64()),
+    ("type", pa.string()),
+    ("tokenTransfers", pa.string()),  # JSON-encoded list
+    ("raw", pa.string()),             # full JSON-encoded transaction
+])
+
+
+class TransactionStore:
+    """
+    Append-only, segment-based store of a wallet's raw Helius transactions.
+
+    Every append writes one Parquet segment holding only transactions whose
+    full signature is not stored yet. The columns needed for filtering
+    (feePayer, slot, timestamp, tokenTransfers) can be scanned without
+    decoding whole transactions, and segments are periodically compacted so
+    history can grow without creating one file per transaction.
+    Legacy one-JSON-file-per-transaction directories are imported on open.
+
+    Several server processes may share a store: every read and write holds
+    a lock file in the store directory, and the cached signature set is
+    brought up to date with segments written or compacted by other
+    processes before it is used.
+    """
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(os.path.join(store_dir, ".lock"))
+        self._signatures: Set[str] = set()
+        # Segments (path -> mtime) whose signatures are in _signatures
+        self._segments: Dict[str, int] = {}
+
+        os.makedirs(store_dir, exist_ok=True)
+        self._import_legacy_files()
+
+    def _segment_paths(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.store_dir, "segment_*.parquet")))
+
+    def _next_segment_path(self) -> str:
+        paths = self._segment_paths()
+        last = int(os.path.basename(paths[-1])[8:-8]) if paths else 0
+        return os.path.join(self.store_dir, f"segment_{last + 1:06d}.parquet")
+
+    def _load_signatures(self) -> Set[str]:
+        """Signatures of every segment; call with the file lock held"""
+        segments = {path: os.stat(path).st_mtime_ns for path in self._segment_paths()}
+        # A removed or rewritten segment (e.g. compaction elsewhere) invalidates the set
+        if any(segments.get(path) != mtime for path, mtime in self._segments.items()):
+            self._signatures = set()
+            self._segments = {}
+
+        for path, mtime in segments.items():
+            if path not in self._segments:
+                column = pq.read_table(path, columns=["signature"]).column("signature")
+                self._signatures.update(column.to_pylist())
+                self._segments[path] = mtime
+        return self._signatures
+
+    @staticmethod
+    def _to_row(tx: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "signature": tx.get("signature"),
+            "feePayer": tx.get("feePayer"),
+            "slot": tx.get("slot"),
+            "timestamp": tx.get("timestamp"),
+            "type": tx.get("type"),
+            "tokenTransfers": dumps_str(tx.get("tokenTransfers") or []),
+            "raw": dumps_str(tx),
+        }
+
+    def append(self, transactions: List[Dict[str, Any]]) -> int:
+        """Store transactions not seen before; returns how many were added"""
+        with self._lock, self._file_lock:
+            signatures = self._load_signatures()
+
+            rows = []
+            for tx in transactions:
+                signature = tx.get("signature")
+                if not signature or signature in signatures:
+                    continue
+                signatures.add(signature)
+                rows.append(self._to_row(tx))
+
+            if not rows:
+                return 0
+
+            path = self._next_segment_path()
+            tmp_path = path + ".tmp"
+            pq.write_table(pa.Table.from_pylist(rows, schema=SEGMENT_SCHEMA), tmp_path)
+            os.replace(tmp_path, path)
+            self._segments[path] = os.stat(path).st_mtime_ns
+
+            if len(self._segment_paths()) > MAX_SEGMENTS:
+                self._compact()
+
+            return len(rows)
+
+    def _compact(self):
+        """Merge all segments into a single one"""
+        paths = self._segment_paths()
+        if len(paths) <= 1:
+            return
+
+        table = pa.concat_tables([pq.read_table(path) for path in paths])
+        merged_path = self._next_segment_path()
+        tmp_path = merged_path + ".tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, merged_path)
+
+        for path in paths:
+            os.remove(path)
+
+        # The merged segment holds exactly the known signatures if every input was known
+        if set(paths) == set(self._segments):
+            self._segments = {merged_path: os.stat(merged_path).st_mtime_ns}
+        else:
+            self._signatures = set()
+            self._segments = {}
+
+    def compact(self):
+        """Merge all segments into a single one"""
+        with self._lock, self._file_lock:
+            self._compact()
+
+    def __len__(self) -> int:
+        with self._lock, self._file_lock:
+            return len(self._load_signatures())
+
+    def scan(self, columns: Optional[List[str]] = None) -> pa.Table:
+        """Read the given columns of every stored transaction"""
+        with self._lock, self._file_lock:
+            paths = self._segment_paths()
+            if not paths:
+                return SEGMENT_SCHEMA.empty_table().select(columns or SEGMENT_SCHEMA.names)
+            return pa.concat_tables([pq.read_table(path, columns=columns) for path in paths])
+
+    def iter_transactions(self) -> Iterator[Dict[str, Any]]:
+        """Yield every stored transaction as the original Helius dict"""
+        for raw in self.scan(["raw"]).column("raw").to_pylist():
+            yield loads(raw)
+
+    def _import_legacy_files(self):
+        """Move per-transaction JSON files from older versions into a segment"""
+        legacy_files = glob.glob(os.path.join(self.store_dir, "*.json"))
+        if not legacy_files:
+            return
+
+        transactions = []
+        imported = []
+        for path in legacy_files:
+            try:
+                transactions.append(load_file(path))
+                imported.append(path)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable legacy transaction file {path}: {e}")
+
+        self.append(transactions)
+        for path in imported:
+            os.remove(path)
+
+
+_stores: Dict[str, TransactionStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_transaction_store(store_dir: str) -> TransactionStore:
+    """Return the process-wide store instance for a directory"""
+    key = os.path.abspath(store_dir)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = TransactionStore(store_dir)
+        return _stores[key]
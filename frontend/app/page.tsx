@@ -54,12 +54,29 @@ export default function Home() {
         body: JSON.stringify({ wallet_address: wallet }),
       });
       
-      const data = await response.json();
+      let data = await response.json();
       
       if (!response.ok) {
         throw new Error(data.detail || "Something went wrong");
       }
       
+      // The analysis runs in the background; poll the job until it finishes
+      const jobId = data.data.job_id;
+      while (data.status !== "success") {
+        if (data.status === "failed") {
+          throw new Error(data.message || "Something went wrong");
+        }
+        
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        
+        const jobResponse = await fetch(`http://localhost:8000/jobs/${jobId}`);
+        data = await jobResponse.json();
+        
+        if (!jobResponse.ok) {
+          throw new Error(data.detail || "Something went wrong");
+        }
+      }
+      
       // Store the result in localStorage to pass it to the results page
       localStorage.setItem("copyTradersResult", JSON.stringify(data));
       